@@ -0,0 +1,254 @@
+import os
+import re
+import time
+import sqlite3
+import threading
+import unicodedata
+from difflib import SequenceMatcher
+import http_client
+import state_store
+
+# ================= 설정 =================
+# 스팀 앱 이름 ↔ appid 로컬 색인입니다. (optiscaler_bot 의 한국어 이름 찾기에 씁니다)
+# 전체 앱 목록을 한 번 받아 SQLite 에 만들어 두고, 하루에 한 번 바뀐 부분만 갱신합니다.
+# 색인 파일은 다시 만들 수 있으므로 저장소에 커밋하지 않고 actions/cache 로만 유지합니다.
+INDEX_DB = os.environ.get('APP_INDEX_DB', '.app_index/app_index.db')
+STEAM_API_KEY = os.environ.get('STEAM_API_KEY')  # 있으면 IStoreService 로 변경분만 받아옵니다.
+REFRESH_INTERVAL = 24 * 3600
+MIN_CONFIDENCE = 0.85     # 이 점수 미만의 후보는 같은 게임으로 보지 않습니다.
+MAX_CANDIDATES = 3000     # 유사도를 계산할 최대 후보 수
+LOOKUP_NS = "app_names"   # state_store 네임스페이스: 정규화된 이름 → 찾은 결과
+LOOKUP_TTL = 30 * 24 * 3600  # 못 찾은 이름(한국어 이름 없음 포함)은 이 기간이 지나면 다시 찾아봅니다.
+RETRY_TTL = 3600             # 한국어 이름 조회가 실패한(네트워크 오류 등) 결과는 이 기간 뒤에 다시 찾아봅니다.
+# =======================================
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS apps (
+    appid INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    norm TEXT NOT NULL,
+    ko_name TEXT,
+    ko_norm TEXT,
+    ko_checked_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_apps_norm ON apps (norm);
+CREATE INDEX IF NOT EXISTS idx_apps_ko_norm ON apps (ko_norm) WHERE ko_norm IS NOT NULL;
+CREATE TABLE IF NOT EXISTS tokens (
+    token TEXT NOT NULL,
+    appid INTEGER NOT NULL,
+    PRIMARY KEY (token, appid)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+TRADEMARKS_RE = re.compile(r'[™®©]')
+APOSTROPHE_RE = re.compile(r"['’`´]")
+NON_WORD_RE = re.compile(r'[\W_]+')
+HANGUL_RE = re.compile(r'[가-힣]')
+
+_conn = None
+_lock = threading.RLock()
+
+def normalize(name):
+    """대소문자·기호·전각 문자 차이를 없앤 비교용 이름"""
+    text = unicodedata.normalize('NFKC', TRADEMARKS_RE.sub('', name or ""))
+    text = APOSTROPHE_RE.sub('', text).lower().replace('&', ' and ')
+    return " ".join(NON_WORD_RE.sub(' ', text).split())
+
+def tokenize(norm):
+    return set(norm.split())
+
+def _db():
+    global _conn
+    with _lock:
+        if _conn is None:
+            db_dir = os.path.dirname(INDEX_DB)
+            if db_dir:
+                os.makedirs(db_dir, exist_ok=True)
+            _conn = sqlite3.connect(INDEX_DB, check_same_thread=False)
+            _conn.executescript(SCHEMA)
+    return _conn
+
+def _meta(key, default=None):
+    row = _db().execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+    return row[0] if row else default
+
+def _set_meta(conn, key, value):
+    conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, str(value)))
+
+def _fetch_store_service(since):
+    """IStoreService/GetAppList 로 since 이후 바뀐 게임만 받아옵니다. (API 키 필요)"""
+    apps = []
+    last_appid = 0
+    while True:
+        res = http_client.get("https://api.steampowered.com/IStoreService/GetAppList/v1/", params={
+            "key": STEAM_API_KEY, "if_modified_since": int(since), "last_appid": last_appid,
+            "max_results": 50000, "include_games": 1
+        }, timeout=60)
+        res.raise_for_status()
+        data = res.json().get('response', {})
+        apps.extend(data.get('apps', []))
+        if not data.get('have_more_results'):
+            return apps
+        last_appid = data['last_appid']
+
+def _fetch_full_list():
+    """ISteamApps/GetAppList/v2 전체 목록 (키 없이 쓸 수 있지만 매번 전부 내려옵니다)"""
+    res = http_client.get("https://api.steampowered.com/ISteamApps/GetAppList/v2/", timeout=60)
+    res.raise_for_status()
+    return res.json().get('applist', {}).get('apps', [])
+
+def _upsert_apps(conn, apps):
+    """새 앱과 이름이 바뀐 앱만 반영합니다. 반영한 개수를 돌려줍니다."""
+    known = dict(conn.execute("SELECT appid, name FROM apps"))
+    changed = 0
+    for app in apps:
+        appid, name = app.get('appid'), (app.get('name') or "").strip()
+        if not appid or not name or known.get(appid) == name:
+            continue
+        norm = normalize(name)
+        if not norm:
+            continue
+        if appid in known:
+            conn.execute("DELETE FROM tokens WHERE appid = ?", (appid,))
+        conn.execute(
+            "INSERT INTO apps (appid, name, norm) VALUES (?, ?, ?) "
+            "ON CONFLICT(appid) DO UPDATE SET name = excluded.name, norm = excluded.norm, "
+            "ko_name = NULL, ko_norm = NULL, ko_checked_at = NULL",
+            (appid, name, norm)
+        )
+        conn.executemany("INSERT OR IGNORE INTO tokens (token, appid) VALUES (?, ?)",
+                         [(token, appid) for token in tokenize(norm)])
+        changed += 1
+    return changed
+
+def refresh(force=False):
+    """색인이 오래됐으면 갱신합니다. 쓸 수 있는 색인이 있으면 True"""
+    with _lock:
+        conn = _db()
+        refreshed_at = float(_meta('refreshed_at', 0))
+        if not force and time.time() - refreshed_at < REFRESH_INTERVAL:
+            return True
+        started = time.time()
+        try:
+            if STEAM_API_KEY:
+                apps = _fetch_store_service(refreshed_at)
+            else:
+                apps = _fetch_full_list()
+            changed = _upsert_apps(conn, apps)
+            _set_meta(conn, 'refreshed_at', started)
+            conn.commit()
+            print(f"📇 앱 색인 갱신: {changed}건 반영 (전체 {conn.execute('SELECT COUNT(*) FROM apps').fetchone()[0]}건)")
+        except Exception as e:
+            conn.rollback()
+            print(f"앱 색인 갱신 실패: {e}")
+        return conn.execute("SELECT 1 FROM apps LIMIT 1").fetchone() is not None
+
+def _score(query_norm, query_tokens, norm):
+    """문자열 유사도와 단어 겹침 비율을 섞은 0~1 점수"""
+    tokens = tokenize(norm)
+    overlap = len(query_tokens & tokens) / len(query_tokens | tokens)
+    return 0.6 * SequenceMatcher(None, query_norm, norm).ratio() + 0.4 * overlap
+
+def match(name):
+    """이름과 가장 비슷한 앱을 찾습니다. (appid, 스팀 이름, 신뢰도) 또는 None"""
+    query_norm = normalize(name)
+    if not query_norm:
+        return None
+    conn = _db()
+    with _lock:
+        exact = conn.execute(
+            "SELECT appid, name FROM apps WHERE norm = ? OR ko_norm = ? ORDER BY appid LIMIT 1", (query_norm, query_norm)
+        ).fetchone()
+        if exact:
+            return exact[0], exact[1], 1.0
+
+        # 가장 드문 단어 두 개를 가진 앱만 후보로 올려서 유사도를 계산합니다. (너무 흔한 단어는 제외)
+        query_tokens = tokenize(query_norm)
+        counts = sorted(
+            (conn.execute("SELECT COUNT(*) FROM tokens WHERE token = ?", (t,)).fetchone()[0], t)
+            for t in query_tokens
+        )
+        rare = [t for c, t in counts if 0 < c <= MAX_CANDIDATES][:2]
+        if not rare:
+            return None
+        rows = conn.execute(
+            f"SELECT DISTINCT a.appid, a.name, a.norm, a.ko_norm FROM tokens t JOIN apps a ON a.appid = t.appid "
+            f"WHERE t.token IN ({','.join('?' * len(rare))}) LIMIT ?",
+            (*rare, MAX_CANDIDATES)
+        ).fetchall()
+
+    best = None
+    for appid, app_name, norm, ko_norm in rows:
+        score = max(_score(query_norm, query_tokens, n) for n in (norm, ko_norm) if n)
+        if best is None or score > best[2]:
+            best = (appid, app_name, score)
+    if best and best[2] >= MIN_CONFIDENCE:
+        return best[0], best[1], round(best[2], 3)
+    return None
+
+def korean_name(appid):
+    """
+    (appid 의 한국어 상점 이름 또는 None, 확인 여부). 확인한 결과는 색인에 저장해 두고 다시 묻지 않습니다.
+    조회에 실패하면 (None, False) 이며 저장하지 않습니다.
+    """
+    conn = _db()
+    row = conn.execute("SELECT ko_name, ko_checked_at FROM apps WHERE appid = ?", (appid,)).fetchone()
+    if row and row[1]:
+        return row[0], True
+
+    ko_name = None
+    try:
+        res = http_client.get("https://store.steampowered.com/api/appdetails",
+                              params={"appids": appid, "l": "korean", "filters": "basic"}, timeout=5)
+        entry = (res.json() or {}).get(str(appid)) or {}
+        if entry.get('success'):
+            name = entry.get('data', {}).get('name', '')
+            if HANGUL_RE.search(name):
+                ko_name = name
+    except Exception as e:
+        print(f"한국어 이름 조회 실패 ({appid}): {e}")
+        return None, False
+
+    with _lock:
+        conn.execute("UPDATE apps SET ko_name = ?, ko_norm = ?, ko_checked_at = ? WHERE appid = ?",
+                     (ko_name, normalize(ko_name) if ko_name else None, time.time(), appid))
+        if ko_name:
+            conn.executemany("INSERT OR IGNORE INTO tokens (token, appid) VALUES (?, ?)",
+                             [(token, appid) for token in tokenize(normalize(ko_name))])
+        conn.commit()
+    return ko_name, True
+
+def _cache_ttl(cached):
+    """저장된 lookup 결과를 다시 쓸 기간. 한국어 이름까지 찾은 결과는 계속 씁니다."""
+    if cached.get('kor_name'):
+        return float('inf')
+    if cached.get('appid') and not cached.get('ko_checked'):
+        return RETRY_TTL
+    return LOOKUP_TTL
+
+def lookup(name):
+    """
+    이름으로 스팀 앱과 한국어 이름을 찾습니다.
+    결과(못 찾은 경우 포함)는 state_store 에 저장해서 같은 이름은 다시 계산하지 않습니다.
+    한국어 이름이 없는 결과는 LOOKUP_TTL, 조회에 실패한 결과는 RETRY_TTL 이 지나면 다시 찾습니다.
+    돌려주는 값: {"appid", "name", "confidence", "kor_name", "ko_checked"} 또는 None (색인을 쓸 수 없을 때)
+    """
+    key = normalize(name)
+    cached = state_store.get(LOOKUP_NS, key)
+    if cached and time.time() - cached.get('checked_at', 0) < _cache_ttl(cached):
+        return cached
+    if not refresh():
+        return None
+
+    found = match(name)
+    result = {"appid": None, "name": None, "confidence": 0.0, "kor_name": None, "ko_checked": False, "checked_at": time.time()}
+    if found:
+        appid, steam_name, confidence = found
+        kor_name, ko_checked = korean_name(appid)
+        result.update(appid=appid, name=steam_name, confidence=confidence, kor_name=kor_name, ko_checked=ko_checked)
+    state_store.upsert(LOOKUP_NS, key, result)
+    return result
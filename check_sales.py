@@ -1,11 +1,14 @@
-import requests
-import json
+import http_client
+import news_watch
+import state_store
+import discord_queue
+import translation_cache
 import os
-import time
 import re
+import time
+from concurrent.futures import ThreadPoolExecutor
 from bs4 import BeautifulSoup
-from discord_webhook import DiscordWebhook, DiscordEmbed
-from deep_translator import GoogleTranslator
+from discord_webhook import DiscordEmbed
 
 # ================= 설정 =================
 WEBHOOK_URL = os.environ.get('DISCORD_WEBHOOK_SALES')
@@ -16,7 +19,8 @@ if not WEBHOOK_URL:
     print("⚠️ [오류] 웹훅 URL이 없습니다. Secrets를 확인하세요!")
     exit()
 
-HISTORY_FILE = "sent_sales.json"
+SALES_APPID = 593110
+HISTORY_NS = "sales"  # state_store 네임스페이스 (기존 sent_sales.json)
 
 KEYWORDS = [
     "Sale", "Fest", "Festival", "Edition", 
@@ -24,32 +28,26 @@ KEYWORDS = [
 ]
 
 EXCLUDE_KEYWORDS = ["Soundtrack", "OST", "Patch", "Hotfix"]
-# =======================================
 
-def load_history():
-    if os.path.exists(HISTORY_FILE):
-        with open(HISTORY_FILE, "r", encoding='utf-8') as f:
-            try: return json.load(f)
-            except: return []
-    return []
+SCRAPE_NS = "sales_scrape"  # gid 별 공식 한국어 페이지 크롤링 결과
+SCRAPE_TTL = 7 * 24 * 3600
+NEWS_WORKERS = 4            # 새 소식을 동시에 크롤링·번역할 개수
+# =======================================
 
-def save_history(history):
-    with open(HISTORY_FILE, "w", encoding='utf-8') as f:
-        if len(history) > 50: history = history[-50:]
-        json.dump(history, f, ensure_ascii=False)
+def needs_translation(text):
+    # 너무 짧거나 이미 한글이면 패스
+    return len(text) >= 2 and not any(ord(c) > 12592 for c in text[:20])
 
-def translate_to_korean(text):
-    """영어를 한국어로 번역 (크롤링 실패 시 비상용)"""
+def translate_to_korean(texts):
+    """영어 문장들을 한 번에 한국어로 번역 (크롤링 실패 시 비상용). 번역하지 못한 문장은 원문 그대로"""
+    # 너무 길면 잘라서 번역 (같은 문장은 캐시에서 바로 가져오고, 나머지는 동시에 번역)
+    targets = [text[:900] for text in texts if needs_translation(text)]
     try:
-        if len(text) < 2: return text
-        # 이미 한글이면 패스
-        if any(ord(c) > 12592 for c in text[:20]): return text
-        
-        translator = GoogleTranslator(source='auto', target='ko')
-        # 너무 길면 잘라서 번역
-        return translator.translate(text[:900]) 
-    except:
-        return text
+        translated = dict(zip(targets, translation_cache.translate_many(targets, source='auto', target='ko'))) if targets else {}
+    except Exception as e:
+        print(f"번역 실패: {e}")
+        translated = {}
+    return [translated.get(text[:900], text) if needs_translation(text) else text for text in texts]
 
 def extract_best_link(raw_text):
     """
@@ -94,7 +92,7 @@ def scrape_official_korean(url):
     headers = {'User-Agent': 'Mozilla/5.0'}
     
     try:
-        response = requests.get(url, cookies=cookies, headers=headers, timeout=5)
+        response = http_client.get(url, cookies=cookies, headers=headers, timeout=5)
         if response.status_code != 200: return None
         
         soup = BeautifulSoup(response.text, 'html.parser')
@@ -106,69 +104,51 @@ def scrape_official_korean(url):
         pass
     return None
 
-def fetch_steam_sales_news():
-    print("📡 스팀 뉴스 API 스캔 중...")
-    url = "https://api.steampowered.com/ISteamNews/GetNewsForApp/v2/?appid=593110&count=10&format=json"
+def cached_scrape(gid, url):
+    """크롤링 결과를 gid 별로 SCRAPE_TTL 동안 저장해 두고 재사용합니다."""
+    cached = state_store.get(SCRAPE_NS, gid)
+    if cached and time.time() - cached.get('scraped_at', 0) < SCRAPE_TTL:
+        return cached.get('text')
+    text = scrape_official_korean(url)
+    state_store.upsert(SCRAPE_NS, gid, {"text": text, "scraped_at": time.time()}, commit=False)
+    return text
+
+def build_news(item):
+    """뉴스 하나를 알림용 데이터로 만듭니다. (링크·유튜브 추출, 크롤링) 번역은 handle_sales_news 가 모아서 합니다."""
+    title = item['title']
+    raw_content = item.get('contents', '')
+    news_url = item.get('url') or f"https://store.steampowered.com/news/app/{SALES_APPID}/view/{item['gid']}"
+
+    # 1. [링크] 원본 데이터에서 '진짜 상점 링크' 찾기 (가장 중요!)
+    real_link = extract_best_link(raw_content)
+    if not real_link:
+        real_link = news_url # 못 찾으면 그냥 뉴스 링크 사용
     
-    try:
-        response = requests.get(url, timeout=10)
-        data = response.json()
-        news_items = data['appnews']['newsitems']
-        
-        sales_news = []
-        for item in news_items:
-            title = item['title']
-            
-            if any(k.lower() in title.lower() for k in EXCLUDE_KEYWORDS): continue
-            
-            if any(k.lower() in title.lower() for k in KEYWORDS):
-                print(f"🎉 발견: {title}")
-                raw_content = item.get('contents', '')
-                news_url = item.get('url') or f"https://store.steampowered.com/news/app/593110/view/{item['gid']}"
-
-                # 1. [링크] 원본 데이터에서 '진짜 상점 링크' 찾기 (가장 중요!)
-                real_link = extract_best_link(raw_content)
-                if not real_link:
-                    real_link = news_url # 못 찾으면 그냥 뉴스 링크 사용
-                
-                # 2. [이미지] 원본 데이터에서 유튜브 ID 찾기
-                youtube_id = extract_youtube_id(raw_content)
-                
-                # 3. [텍스트] 한국어 설명 만들기
-                # (A) 크롤링 먼저 시도
-                korean_text = scrape_official_korean(news_url)
-                
-                # (B) 크롤링 실패 시 -> 원본 청소 후 번역기 가동
-                if not korean_text or len(korean_text) < 10:
-                    print("⚠️ 크롤링 실패/차단됨 -> 번역기 모드로 전환")
-                    clean_english = clean_raw_text(raw_content)
-                    korean_text = translate_to_korean(clean_english)
-
-                # 4. 제목도 번역
-                korean_title = translate_to_korean(title)
-
-                # 최종 정리 (길이 제한)
-                if len(korean_text) > 250: korean_text = korean_text[:250] + "..."
-
-                sales_news.append({
-                    "id": item['gid'],
-                    "title": korean_title,
-                    "desc": korean_text,
-                    "link": real_link,  # 추출한 진짜 링크
-                    "youtube_id": youtube_id,
-                    "date": item['date']
-                })
-        
-        return sales_news[::-1]
-        
-    except Exception as e:
-        print(f"❌ 에러: {e}")
-        return []
+    # 2. [이미지] 원본 데이터에서 유튜브 ID 찾기
+    youtube_id = extract_youtube_id(raw_content)
+    
+    # 3. [텍스트] 한국어 설명 만들기
+    # (A) 크롤링 먼저 시도
+    korean_text = cached_scrape(item['gid'], news_url)
+    
+    # (B) 크롤링 실패 시 -> 원본 청소 후 번역기 가동
+    translate_desc = not korean_text or len(korean_text) < 10
+    if translate_desc:
+        print("⚠️ 크롤링 실패/차단됨 -> 번역기 모드로 전환")
+        korean_text = clean_raw_text(raw_content)
+
+    return {
+        "id": item['gid'],
+        "title": title,
+        "desc": korean_text,
+        "translate_desc": translate_desc,
+        "link": real_link,  # 추출한 진짜 링크
+        "youtube_id": youtube_id,
+        "date": item['date']
+    }
 
 def send_discord_alert(news):
     print(f"🚀 전송: {news['title']}")
-    webhook = DiscordWebhook(url=WEBHOOK_URL)
-    
     embed = DiscordEmbed(
         title=f"🎪 {news['title']}",
         description=f"{news['desc']}\n\n[👉 축제 상점 페이지 바로가기]({news['link']})",
@@ -180,29 +160,47 @@ def send_discord_alert(news):
     else:
         embed.set_thumbnail(url="https://upload.wikimedia.org/wikipedia/commons/thumb/8/83/Steam_icon_logo.svg/2048px-Steam_icon_logo.svg.png")
     
-    webhook.add_embed(embed)
-    webhook.execute()
+    discord_queue.enqueue(WEBHOOK_URL, [embed])
+
+def handle_sales_news(watch, items):
+    """새 세일 소식을 동시에 크롤링·번역해서 오래된 순으로 보냅니다."""
+    for item in items:
+        print(f"🎉 발견: {item['title']}")
+    with ThreadPoolExecutor(max_workers=min(NEWS_WORKERS, len(items))) as executor:
+        sales_news = list(executor.map(build_news, items))
+    state_store.evict(SCRAPE_NS, max_age=SCRAPE_TTL)
+
+    # 4. 제목과 (크롤링에 실패한) 설명을 모아서 한 번에 번역
+    fields = [(news, 'title') for news in sales_news] + [(news, 'desc') for news in sales_news if news.pop('translate_desc')]
+    for (news, field), text in zip(fields, translate_to_korean([news[field] for news, field in fields])):
+        news[field] = text
+    
+    for news in sales_news:
+        # 최종 정리 (길이 제한)
+        if len(news['desc']) > 250: news['desc'] = news['desc'][:250] + "..."
+        send_discord_alert(news)
+
+WATCH = {
+    "topic": "sales",
+    "appids": [SALES_APPID],
+    "keywords": KEYWORDS,
+    "exclude": EXCLUDE_KEYWORDS,
+    "history_ns": HISTORY_NS,
+    "keep_latest": 50,
+    "maxlength": 0,  # 상점 링크·유튜브 ID 를 본문에서 찾으므로 본문 전체가 필요합니다.
+    "handler": handle_sales_news,
+    "webhook": WEBHOOK_URL
+}
 
 def run():
     print("--- 스팀 세일 봇 (하이브리드 버전) ---")
-    history = load_history()
-    sales_news = fetch_steam_sales_news()
-    
-    updated_history = history[:]
-    msg_count = 0
+    print("📡 스팀 뉴스 API 스캔 중...")
+    msg_count = news_watch.run([WATCH])
     
-    for news in sales_news:
-        if news['id'] not in history:
-            send_discord_alert(news)
-            updated_history.append(news['id'])
-            msg_count += 1
-            time.sleep(1)
-            
     if msg_count > 0:
-        save_history(updated_history)
         print("완료.")
     else:
         print("새로운 소식 없음.")
 
 if __name__ == "__main__":
-    run()
\ No newline at end of file
+    run()
@@ -1,9 +1,7 @@
-import requests
-import json
+import news_watch
+import discord_queue
 import os
-import time
-from discord_webhook import DiscordWebhook, DiscordEmbed
-from bs4 import BeautifulSoup
+from discord_webhook import DiscordEmbed
 
 # ================= 설정 =================
 WEBHOOK_URL = os.environ.get('WEBHOOK_PRIVATE')
@@ -12,53 +10,13 @@ if not WEBHOOK_URL:
     print("⚠️ 오류: WEBHOOK_PRIVATE 설정이 필요합니다.")
     exit()
 
-HISTORY_FILE = "sent_steamos.json"
+STEAMOS_APPID = 1675200
+HISTORY_NS = "steamos"  # state_store 네임스페이스 (기존 sent_steamos.json)
 # 감시 키워드
 KEYWORDS = ["Preview", "SteamOS", "Client Update", "Beta", "Stable"]
 # =======================================
 
-def load_history():
-    if os.path.exists(HISTORY_FILE):
-        with open(HISTORY_FILE, "r", encoding='utf-8') as f:
-            try:
-                return json.load(f)
-            except:
-                return []
-    return []
-
-def save_history(history):
-    with open(HISTORY_FILE, "w", encoding='utf-8') as f:
-        json.dump(history, f, ensure_ascii=False)
-
-def fetch_steamos_news():
-    url = "https://api.steampowered.com/ISteamNews/GetNewsForApp/v2/?appid=1675200&count=10&format=json"
-    
-    try:
-        response = requests.get(url, timeout=10)
-        data = response.json()
-        news_items = data['appnews']['newsitems']
-        
-        updates = []
-        for item in news_items:
-            title = item['title']
-            
-            # 키워드 체크
-            if any(k.lower() in title.lower() for k in KEYWORDS):
-                # 이미지나 요약 없이 기본 정보만 저장
-                updates.append({
-                    "id": item['gid'],
-                    "title": title,
-                    "url": item['url'],
-                    "date": item['date']
-                })
-        return updates[::-1]
-    except Exception as e:
-        print(f"뉴스 가져오기 실패: {e}")
-        return []
-
 def send_private_alert(update):
-    webhook = DiscordWebhook(url=WEBHOOK_URL)
-    
     title_text = update['title']
     
     # [구분 로직] 제목에 따라 색상과 아이콘 변경
@@ -87,27 +45,29 @@ def send_private_alert(update):
         color=color
     )
     
-    webhook.add_embed(embed)
-    webhook.execute()
+    discord_queue.enqueue(WEBHOOK_URL, [embed])
+
+def handle_updates(watch, items):
+    for item in items:
+        print(f"발견: {item['title']}")
+        # 이미지나 요약 없이 기본 정보만 전송
+        send_private_alert({"id": item['gid'], "title": item['title'], "url": item['url'], "date": item['date']})
+
+WATCH = {
+    "topic": "steamos",
+    "appids": [STEAMOS_APPID],
+    "keywords": KEYWORDS,
+    "history_ns": HISTORY_NS,
+    "maxlength": 1,  # 제목과 링크만 쓰므로 본문은 받지 않습니다.
+    "handler": handle_updates,
+    "webhook": WEBHOOK_URL
+}
 
 def run():
     print("스팀OS 감시 시작 (심플 모드)...")
-    history = load_history()
-    updates = fetch_steamos_news()
-    
-    updated_history = history[:]
-    msg_count = 0
+    msg_count = news_watch.run([WATCH])
     
-    for update in updates:
-        if update['id'] not in history:
-            print(f"발견: {update['title']}")
-            send_private_alert(update)
-            updated_history.append(update['id'])
-            msg_count += 1
-            time.sleep(1)
-            
     if msg_count > 0:
-        save_history(updated_history)
         print("전송 완료.")
     else:
         print("새로운 업데이트 없음.")
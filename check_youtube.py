@@ -1,113 +1,179 @@
-import requests
-import json
+import http_client
+import http_cache
+import state_store
+import discord_queue
 import os
 import xml.etree.ElementTree as ET
-from discord_webhook import DiscordWebhook, DiscordEmbed
+from concurrent.futures import ThreadPoolExecutor
+from discord_webhook import DiscordEmbed
 
 # ================= 설정 =================
 WEBHOOK_URL = os.environ.get('DISCORD_WEBHOOK_NEWVIDEO')
-YOUTUBE_CHANNEL_ID = "UCcJeDBJiD3SlIvnKEplxX-Q" 
-HISTORY_FILE = "sent_videos.json"
+YOUTUBE_CHANNEL_ID = "UCcJeDBJiD3SlIvnKEplxX-Q"
+# 여러 채널을 감시하려면 YOUTUBE_CHANNELS 에 채널 ID 를 쉼표로 구분해서 넣으세요.
+CHANNELS = [c.strip() for c in (os.environ.get('YOUTUBE_CHANNELS') or YOUTUBE_CHANNEL_ID).split(',') if c.strip()]
+HISTORY_NS = "videos"  # state_store 네임스페이스 (기존 sent_videos.json)
+SHORTS_NS = "shorts"   # 영상 ID → 쇼츠 여부 (바뀌지 않으므로 영구 저장)
+FETCH_WORKERS = 4      # 채널 피드를 동시에 가져올 개수
+SHORTS_WORKERS = 8     # 쇼츠 확인 요청을 동시에 보낼 개수
+KEEP_PER_CHANNEL = 50  # 채널당 남겨 둘 처리 기록 수 (피드 한 번에 최대 15개가 실립니다)
+# 기록은 모든 채널이 한 곳에 함께 쌓이고 최근에 갱신된 순으로 정리됩니다. 그래서 실행할 때마다 각 채널 피드에
+# 아직 실려 있는 영상의 기록을 갱신해서, 바쁜 채널 때문에 조용한 채널의 기록이 밀려 지워지지 않게 합니다.
 # =======================================
 
-def load_history():
-    if os.path.exists(HISTORY_FILE):
-        with open(HISTORY_FILE, "r", encoding='utf-8') as f:
-            try: return json.load(f)
-            except: return []
-    return []
-
-def save_history(history):
-    with open(HISTORY_FILE, "w", encoding='utf-8') as f:
-        json.dump(history, f, ensure_ascii=False)
-
-def fetch_latest_video():
-    url = f"https://www.youtube.com/feeds/videos.xml?channel_id={YOUTUBE_CHANNEL_ID}"
-    print(f"📡 접속 시도 중: {url}")  
-    
+FEED_NS = {'yt': 'http://www.youtube.com/xml/schemas/2015', 'media': 'http://search.yahoo.com/mrss/', 'atom': 'http://www.w3.org/2005/Atom'}
+
+def parse_entry(entry):
+    """Atom <entry> 하나를 알림용 영상 정보로 바꿉니다. (웹훅 수신기도 같은 매핑을 씁니다)"""
+    video_id = entry.find('yt:videoId', FEED_NS).text
+    # WebSub 푸시 본문에는 media:group 이 없으므로 기본 썸네일 주소를 씁니다.
+    thumbnail = entry.find('media:group/media:thumbnail', FEED_NS)
+    return {
+        "id": video_id,
+        "channel_id": entry.findtext('yt:channelId', default="", namespaces=FEED_NS),
+        "title": entry.find('atom:title', FEED_NS).text,
+        "link": entry.find('atom:link', FEED_NS).attrib['href'],
+        "author": entry.find('atom:author/atom:name', FEED_NS).text,
+        "published": entry.findtext('atom:published', default="", namespaces=FEED_NS),
+        "thumbnail": thumbnail.attrib['url'] if thumbnail is not None else f"https://i.ytimg.com/vi/{video_id}/hqdefault.jpg"
+    }
+
+def parse_feed(content):
+    """피드 XML 의 모든 영상을 피드 순서(최신순)대로 돌려줍니다. 형식이 다른 항목은 건너뜁니다."""
+    videos = []
+    for entry in ET.fromstring(content).findall('atom:entry', FEED_NS):
+        try:
+            videos.append(parse_entry(entry))
+        except (AttributeError, KeyError) as e:
+            print(f"⚠️ 피드 항목 파싱 실패: {e}")
+    return videos
+
+def fetch_channel_videos(channel_id):
+    """채널 피드의 영상 목록(최신순). 실패하면 None"""
+    url = f"https://www.youtube.com/feeds/videos.xml?channel_id={channel_id}"
+    print(f"📡 접속 시도 중: {url}")
+
     try:
-        response = requests.get(url, timeout=10)
-        print(f"응답 코드: {response.status_code}") 
-        
+        response = http_cache.get(url, timeout=10)
+        print(f"응답 코드: {response.status_code}")
+
         if response.status_code != 200:
-            print(f"❌ 접속 실패! 원인: {response.text[:100]}") 
+            print(f"❌ 접속 실패! 원인: {response.text[:100]}")
             return None
-            
-        root = ET.fromstring(response.content)
-        ns = {'yt': 'http://www.youtube.com/xml/schemas/2015', 'media': 'http://search.yahoo.com/mrss/', 'atom': 'http://www.w3.org/2005/Atom'}
-        entry = root.find('atom:entry', ns)
-        
-        if entry:
-            return {
-                "id": entry.find('yt:videoId', ns).text,
-                "title": entry.find('atom:title', ns).text,
-                "link": entry.find('atom:link', ns).attrib['href'],
-                "author": entry.find('atom:author/atom:name', ns).text,
-                "thumbnail": entry.find('media:group', ns).find('media:thumbnail', ns).attrib['url']
-            }
+
+        # 피드가 지난번과 같아도(304) 저장된 본문으로 확인합니다. 이미 본 영상에서 바로 멈추므로 비용이 거의 없습니다.
+        return parse_feed(response.content)
     except Exception as e:
         print(f"❌ 치명적 에러: {e}")
         return None
-    return None
+
+def new_videos(videos):
+    """
+    최신순 영상 목록에서 이미 처리한 영상이 나오기 전까지의 새 영상을 오래된 순으로 돌려줍니다.
+    처리 기록이 하나도 겹치지 않으면(처음 감시하는 채널) 가장 최근 영상만 알리고 나머지는 본 것으로 기록합니다.
+    """
+    fresh = []
+    for video in videos:
+        if state_store.is_seen(HISTORY_NS, video['id']):
+            return fresh[::-1]
+        fresh.append(video)
+    for video in fresh[1:]:
+        state_store.upsert(HISTORY_NS, video['id'], commit=False)
+    return fresh[:1]
+
+def touch_seen(videos):
+    """피드에 아직 실려 있는, 이미 처리한 영상의 기록 시각을 갱신합니다. (정리 대상에서 빠지도록)"""
+    for video in videos:
+        if state_store.is_seen(HISTORY_NS, video['id']):
+            state_store.upsert(HISTORY_NS, video['id'], commit=False)
 
 def is_short(video_id):
     """
-    유튜브 URL 리다이렉트 특성을 이용해 쇼츠 영상인지 판별합니다.
+    유튜브 URL 리다이렉트 특성을 이용해 쇼츠 영상인지 판별합니다. 확인하지 못하면 None
     """
     url = f"https://www.youtube.com/shorts/{video_id}"
     try:
         # 봇 차단을 방지하기 위해 User-Agent 추가 및 리다이렉트 추적 방지
         headers = {"User-Agent": "Mozilla/5.0"}
-        response = requests.head(url, headers=headers, allow_redirects=False, timeout=5)
-        
+        response = http_client.head(url, headers=headers, allow_redirects=False, timeout=5)
+
         # 상태 코드가 200이면 쇼츠, 303 등 다른 코드면 일반 영상으로 리다이렉트됨
         return response.status_code == 200
     except Exception as e:
         print(f"⚠️ 쇼츠 확인 중 에러 발생: {e}")
-        return False
+        return None
+
+def classify_shorts(video_ids):
+    """{영상 ID: 쇼츠 여부}. 저장된 결과는 그대로 쓰고, 처음 보는 영상만 동시에 확인해서 저장합니다."""
+    result = {}
+    unknown = []
+    for video_id in video_ids:
+        cached = state_store.get(SHORTS_NS, video_id)
+        if cached is None:
+            unknown.append(video_id)
+        else:
+            result[video_id] = cached
+
+    if unknown:
+        with ThreadPoolExecutor(max_workers=min(SHORTS_WORKERS, len(unknown))) as executor:
+            for video_id, short in zip(unknown, executor.map(is_short, unknown)):
+                # 확인에 실패한 영상은 일반 영상으로 보고 저장하지 않습니다. (다음에 다시 확인)
+                result[video_id] = bool(short)
+                if short is not None:
+                    state_store.upsert(SHORTS_NS, video_id, short, commit=False)
+    return result
 
 def send_discord_alert(video):
     if not WEBHOOK_URL: return
-    webhook = DiscordWebhook(url=WEBHOOK_URL)
     embed = DiscordEmbed(
         title=f"📺 {video['author']} 새 영상!",
         description=f"**{video['title']}**\n[보기]({video['link']})",
         color='FF0000'
     )
     embed.set_image(url=video['thumbnail'])
-    webhook.add_embed(embed)
-    webhook.execute()
+    discord_queue.enqueue(WEBHOOK_URL, [embed])
+
+def process_videos(videos):
+    """새 영상 목록(오래된 순)의 쇼츠 여부를 확인하고 일반 영상만 알립니다. 알린 개수를 돌려줍니다."""
+    if not videos:
+        return 0
+    shorts = classify_shorts([video['id'] for video in videos])
+    sent = 0
+    for video in videos:
+        print(f"✅ 새 영상: {video['title']}")
+        if shorts[video['id']]:
+            print("🚫 이 영상은 쇼츠(Shorts)이므로 알림을 건너뜁니다.")
+        else:
+            print("새 일반 영상입니다! 알림 전송...")
+            send_discord_alert(video)
+            sent += 1
+        # 처리한 영상 ID를 기록합니다.
+        state_store.upsert(HISTORY_NS, video['id'], commit=False)
+    discord_queue.flush()
+
+    # 기록이 너무 길어지지 않도록 채널당 최신 KEEP_PER_CHANNEL 개만 남기고 지웁니다.
+    state_store.evict(HISTORY_NS, keep_latest=KEEP_PER_CHANNEL * len(CHANNELS))
+    state_store.commit()
+    return sent
 
 def run():
     print("--- 유튜브 봇 디버그 모드 시작 ---")
-    history = load_history()
-    video = fetch_latest_video()
-    
-    if video:
-        print(f"✅ 영상 가져오기 성공: {video['title']}")
-        if video['id'] not in history:
-            
-            # 쇼츠 여부를 검사합니다.
-            if is_short(video['id']):
-                print("🚫 이 영상은 쇼츠(Shorts)이므로 알림을 건너뜁니다.")
-            else:
-                print("새 일반 영상입니다! 알림 전송...")
-                send_discord_alert(video)
-            
-            # 히스토리 배열에 새 영상 ID를 추가합니다.
-            history.append(video['id'])
-            
-            # 기록이 너무 길어지지 않도록 최신 50개만 남기고 자릅니다.
-            if len(history) > 50:
-                history = history[-50:] 
-                
-            # 업데이트된 배열을 파일에 저장합니다.
-            save_history(history)
-            
-        else:
-            print("이미 처리된 영상입니다.")
-    else:
-        print("결국 피드를 가져오지 못했습니다.")
+    with ThreadPoolExecutor(max_workers=min(FETCH_WORKERS, len(CHANNELS))) as executor:
+        feeds = list(executor.map(fetch_channel_videos, CHANNELS))
+
+    pending = []
+    for channel_id, videos in zip(CHANNELS, feeds):
+        if videos is None:
+            print(f"결국 피드를 가져오지 못했습니다. ({channel_id})")
+            continue
+        fresh = new_videos(videos)
+        touch_seen(videos)
+        if not fresh:
+            print(f"새 영상 없음. ({channel_id})")
+        pending.extend(fresh)
+
+    process_videos(pending)
+    state_store.commit()
 
 if __name__ == "__main__":
     run()
@@ -0,0 +1,143 @@
+import time
+import queue
+import atexit
+import threading
+from concurrent.futures import Future
+import http_client
+
+# ================= 설정 =================
+# 모든 봇이 함께 쓰는 디스코드 웹훅 전송 대기열입니다.
+# 고정된 sleep 대신 응답 헤더(X-RateLimit-Remaining / X-RateLimit-Reset-After)로
+# 웹훅별 남은 횟수를 추적해서, 허용되는 만큼 바로 보내고 한도에 닿으면 그때만 기다립니다.
+MAX_RETRIES = 5         # 429 / 5xx / 통신 에러 재시도 횟수
+RETRY_BACKOFF = 1.0     # 5xx / 통신 에러 재시도 기본 대기 시간(초), 시도마다 2배
+# =======================================
+
+_queues = {}    # 웹훅 URL → 작업 대기열 (웹훅마다 전송 순서 보장)
+_buckets = {}   # 웹훅 URL → {"remaining": 남은 횟수, "reset_at": 초기화 시각}
+_lock = threading.Lock()
+_MESSAGE_GONE = object()  # 수정하려던 메시지가 이미 없음(404)
+
+def _embed_to_dict(embed):
+    data = embed if isinstance(embed, dict) else embed.__dict__
+    return {k: v for k, v in data.items() if v not in (None, [], {})}
+
+def _get_queue(webhook_url):
+    with _lock:
+        q = _queues.get(webhook_url)
+        if q is None:
+            q = queue.Queue()
+            _queues[webhook_url] = q
+            _buckets[webhook_url] = {"remaining": None, "reset_at": 0.0}
+            threading.Thread(target=_worker, args=(webhook_url, q), daemon=True).start()
+    return q
+
+def enqueue(webhook_url, embeds, wait=False):
+    """
+    임베드 목록을 전송 대기열에 넣고 Future 를 돌려줍니다.
+    wait=True 이면 Future 결과로 새 메시지 ID 를, 아니면 전송 성공 여부(True/False)를 받습니다.
+    """
+    payload = {"embeds": [_embed_to_dict(e) for e in embeds]}
+    return _submit(webhook_url, "POST", webhook_url, payload, {"wait": "true"} if wait else None)
+
+def enqueue_edit(webhook_url, message_id, embeds):
+    """
+    이미 보낸 메시지를 그 자리에서 수정(PATCH)합니다. Future 결과는 메시지 ID 입니다.
+    메시지가 지워져서 404 가 오면 새 메시지로 다시 보내고, 그 새 ID 를 돌려줍니다.
+    """
+    payload = {"embeds": [_embed_to_dict(e) for e in embeds]}
+    return _submit(webhook_url, "PATCH", f"{webhook_url}/messages/{message_id}", payload, {"wait": "true"})
+
+def enqueue_delete(webhook_url, message_id):
+    """이미 보낸 메시지를 지우는 작업을 대기열에 넣습니다."""
+    return _submit(webhook_url, "DELETE", f"{webhook_url}/messages/{message_id}", None, None)
+
+def _submit(webhook_url, method, target, payload, params):
+    future = Future()
+    _get_queue(webhook_url).put((method, target, payload, params, future))
+    return future
+
+def flush():
+    """대기열에 남은 모든 전송이 끝날 때까지 기다립니다."""
+    with _lock:
+        queues = list(_queues.values())
+    for q in queues:
+        q.join()
+
+atexit.register(flush)
+
+def _worker(webhook_url, q):
+    while True:
+        method, target, payload, params, future = q.get()
+        try:
+            result = _deliver(webhook_url, method, target, payload, params)
+            if result is _MESSAGE_GONE:
+                print("수정할 메시지가 없어서(404) 새 메시지로 전송합니다.")
+                result = _deliver(webhook_url, "POST", webhook_url, payload, params)
+            future.set_result(result)
+        except Exception as e:
+            print(f"디스코드 웹훅 전송 실패: {e}")
+            future.set_result(None)
+        finally:
+            q.task_done()
+
+def _wait_for_bucket(bucket):
+    if bucket["remaining"] is not None and bucket["remaining"] <= 0:
+        delay = bucket["reset_at"] - time.time()
+        if delay > 0:
+            time.sleep(delay)
+        bucket["remaining"] = None
+
+def _update_bucket(bucket, headers):
+    remaining = headers.get('X-RateLimit-Remaining')
+    reset_after = headers.get('X-RateLimit-Reset-After')
+    if remaining is not None:
+        bucket["remaining"] = int(remaining)
+    elif bucket["remaining"] is not None:
+        bucket["remaining"] -= 1
+    if reset_after is not None:
+        bucket["reset_at"] = time.time() + float(reset_after)
+
+def _retry_after(response):
+    try:
+        return float(response.json().get('retry_after', 1))
+    except:
+        return float(response.headers.get('Retry-After', 1))
+
+def _deliver(webhook_url, method, target, payload, params):
+    bucket = _buckets[webhook_url]
+    response = None
+    for attempt in range(MAX_RETRIES + 1):
+        _wait_for_bucket(bucket)
+        try:
+            response = http_client.request(method, target, json=payload, params=params)
+        except Exception as e:
+            print(f"디스코드 통신 에러 (재시도 {attempt + 1}/{MAX_RETRIES}): {e}")
+            time.sleep(RETRY_BACKOFF * (2 ** attempt))
+            continue
+
+        _update_bucket(bucket, response.headers)
+
+        if response.status_code == 429:
+            delay = _retry_after(response)
+            print(f"⏳ 디스코드 속도 제한 - {delay:.2f}초 후 재시도")
+            bucket["remaining"] = 0
+            bucket["reset_at"] = time.time() + delay
+            continue
+        if response.status_code >= 500:
+            time.sleep(RETRY_BACKOFF * (2 ** attempt))
+            continue
+        break
+
+    if response is not None and response.status_code == 404 and method == "PATCH":
+        return _MESSAGE_GONE
+    if response is None or response.status_code not in [200, 201, 204]:
+        code = response.status_code if response is not None else "응답 없음"
+        print(f"디스코드 웹훅 전송 실패: {method} {code}")
+        return None if params and params.get("wait") else False
+
+    if params and params.get("wait"):
+        resp_json = response.json()
+        if isinstance(resp_json, list): return resp_json[0].get('id')
+        return resp_json.get('id')
+    return True
@@ -0,0 +1,145 @@
+import os
+import json
+import time
+import atexit
+import hashlib
+import tempfile
+import requests
+import http_client
+
+# ================= 설정 =================
+# 조건부 요청(ETag / Last-Modified)용 디스크 캐시입니다.
+# 서버가 304를 돌려주면 저장해 둔 본문을 그대로 씁니다. (호출하는 쪽은 200 과 똑같이 다시 파싱합니다)
+CACHE_DIR = os.environ.get('HTTP_CACHE_DIR', '.http_cache')
+MAX_CACHE_BYTES = int(os.environ.get('HTTP_CACHE_MAX_BYTES', 50 * 1024 * 1024))
+MAX_ENTRY_AGE = 14 * 24 * 3600  # 이 기간 동안 한 번도 쓰이지 않은 항목은 삭제
+# =======================================
+
+def _paths(url):
+    key = hashlib.sha1(url.encode('utf-8')).hexdigest()
+    base = os.path.join(CACHE_DIR, key)
+    return base + ".json", base + ".body"
+
+def _load_entry(url):
+    meta_path, body_path = _paths(url)
+    if not (os.path.exists(meta_path) and os.path.exists(body_path)):
+        return None, None
+    try:
+        with open(meta_path, "r", encoding='utf-8') as f:
+            meta = json.load(f)
+        with open(body_path, "rb") as f:
+            body = f.read()
+        if meta.get('url') != url:
+            return None, None
+        return meta, body
+    except:
+        return None, None
+
+def _write_atomic(path, data, mode):
+    # 여러 스레드가 같은 URL 을 동시에 저장할 수 있으므로 임시 파일 이름은 쓸 때마다 새로 만듭니다.
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    encoding = 'utf-8' if 'b' not in mode else None
+    try:
+        with open(fd, mode, encoding=encoding) as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except:
+        os.remove(tmp_path)
+        raise
+
+def _store_entry(url, response):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    meta_path, body_path = _paths(url)
+    meta = {
+        "url": url,
+        "etag": response.headers.get('ETag'),
+        "last_modified": response.headers.get('Last-Modified'),
+        "content_type": response.headers.get('Content-Type', ''),
+        "encoding": response.encoding,
+        "stored_at": time.time()
+    }
+    _write_atomic(body_path, response.content, "wb")
+    _write_atomic(meta_path, json.dumps(meta, ensure_ascii=False), "w")
+
+def _touch(url, meta):
+    meta_path, body_path = _paths(url)
+    meta['stored_at'] = time.time()
+    try:
+        _write_atomic(meta_path, json.dumps(meta, ensure_ascii=False), "w")
+        os.utime(body_path, None)
+    except:
+        pass
+
+def _cached_response(url, meta, body):
+    """저장된 본문으로 requests.Response 객체를 만들어 돌려줍니다."""
+    response = requests.models.Response()
+    response.status_code = 200
+    response.url = url
+    response._content = body
+    response.encoding = meta.get('encoding')
+    response.headers['Content-Type'] = meta.get('content_type', '')
+    return response
+
+def get(url, params=None, headers=None, **kwargs):
+    """
+    캐시를 거쳐 GET 요청을 보냅니다.
+    반환값은 일반 Response이며, 변경이 없으면(304) 저장해 둔 본문을 담은 200 응답입니다.
+    """
+    if params:
+        url = requests.Request('GET', url, params=params).prepare().url
+
+    meta, body = _load_entry(url)
+
+    request_headers = dict(headers or {})
+    if meta is not None:
+        if meta.get('etag'): request_headers['If-None-Match'] = meta['etag']
+        if meta.get('last_modified'): request_headers['If-Modified-Since'] = meta['last_modified']
+
+    response = http_client.get(url, headers=request_headers, **kwargs)
+
+    if response.status_code == 304 and meta is not None:
+        _touch(url, meta)
+        return _cached_response(url, meta, body)
+
+    if response.status_code == 200:
+        try:
+            _store_entry(url, response)
+        except Exception as e:
+            print(f"HTTP 캐시 저장 실패: {e}")
+    return response
+
+def prune():
+    """오래된 항목을 지우고, 전체 용량이 한도를 넘으면 가장 오래 안 쓰인 항목부터 지웁니다."""
+    if not os.path.isdir(CACHE_DIR):
+        return
+    now = time.time()
+    entries = []
+    total = 0
+    for name in os.listdir(CACHE_DIR):
+        if not name.endswith(".body"):
+            continue
+        body_path = os.path.join(CACHE_DIR, name)
+        meta_path = body_path[:-len(".body")] + ".json"
+        try:
+            stat = os.stat(body_path)
+        except OSError:
+            continue
+        if now - stat.st_mtime > MAX_ENTRY_AGE:
+            _remove(body_path, meta_path)
+            continue
+        entries.append((stat.st_mtime, stat.st_size, body_path, meta_path))
+        total += stat.st_size
+
+    entries.sort()
+    for _, size, body_path, meta_path in entries:
+        if total <= MAX_CACHE_BYTES:
+            break
+        _remove(body_path, meta_path)
+        total -= size
+
+def _remove(*paths):
+    for path in paths:
+        try: os.remove(path)
+        except OSError: pass
+
+atexit.register(prune)
@@ -0,0 +1,86 @@
+import os
+import time
+import threading
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# ================= 설정 =================
+# 모든 봇 스크립트가 함께 쓰는 HTTP 클라이언트입니다.
+# 호스트별로 연결(keep-alive)을 재사용해서 매 요청마다 TCP+TLS 핸드셰이크를 반복하지 않습니다.
+DEFAULT_TIMEOUT = float(os.environ.get('HTTP_TIMEOUT', 10))
+POOL_SIZE = int(os.environ.get('HTTP_POOL_SIZE', 16))  # 호스트당 유지할 연결 수
+RETRY_TOTAL = int(os.environ.get('HTTP_RETRIES', 2))
+RETRY_BACKOFF = float(os.environ.get('HTTP_BACKOFF', 0.5))
+RETRY_STATUS = [500, 502, 503, 504]
+
+# 호스트별 최소 요청 간격(초) - 동시 요청이 많아도 이 속도를 넘지 않습니다.
+HOST_MIN_INTERVAL = {
+    "store.steampowered.com": float(os.environ.get('STEAM_STORE_INTERVAL', 0.1)),
+    "github.com": float(os.environ.get('GITHUB_INTERVAL', 0.1)),
+}
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64)'
+}
+# =======================================
+
+_session = None
+_session_lock = threading.Lock()
+_host_next_slot = {}  # 호스트 → 다음 요청이 허용되는 시각
+_throttle_lock = threading.Lock()
+
+def get_session():
+    """공용 세션을 만들어 돌려줍니다. (최초 1회만 생성)"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                retry = Retry(
+                    total=RETRY_TOTAL,
+                    backoff_factor=RETRY_BACKOFF,
+                    status_forcelist=RETRY_STATUS,
+                    allowed_methods=["GET", "HEAD"],
+                    raise_on_status=False
+                )
+                adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE, max_retries=retry)
+                session = requests.Session()
+                session.headers.update(DEFAULT_HEADERS)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _session = session
+    return _session
+
+def _throttle(url):
+    """HOST_MIN_INTERVAL 에 등록된 호스트는 요청 간격을 지키도록 차례를 기다립니다."""
+    host = urlsplit(url).hostname
+    interval = HOST_MIN_INTERVAL.get(host)
+    if not interval:
+        return
+    with _throttle_lock:
+        now = time.time()
+        slot = max(now, _host_next_slot.get(host, 0.0))
+        _host_next_slot[host] = slot + interval
+    if slot > now:
+        time.sleep(slot - now)
+
+def request(method, url, **kwargs):
+    kwargs.setdefault('timeout', DEFAULT_TIMEOUT)
+    _throttle(url)
+    return get_session().request(method, url, **kwargs)
+
+def get(url, **kwargs):
+    return request("GET", url, **kwargs)
+
+def head(url, **kwargs):
+    return request("HEAD", url, **kwargs)
+
+def post(url, **kwargs):
+    return request("POST", url, **kwargs)
+
+def patch(url, **kwargs):
+    return request("PATCH", url, **kwargs)
+
+def delete(url, **kwargs):
+    return request("DELETE", url, **kwargs)
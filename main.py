@@ -1,10 +1,13 @@
-import requests
-import json
+import http_client
+import http_cache
+import state_store
+import discord_queue
+import search_rows
+import recheck_scheduler
 import os
 import time
-import re
-from bs4 import BeautifulSoup
-from discord_webhook import DiscordWebhook, DiscordEmbed
+from concurrent.futures import ThreadPoolExecutor
+from discord_webhook import DiscordEmbed
 
 # ================= 설정 (SETTINGS) =================
 WEBHOOK_URL = os.environ.get('DISCORD_WEBHOOK')
@@ -14,7 +17,7 @@ if not WEBHOOK_URL:
     exit()
 
 MIN_REVIEWS = 100  # 인기 게임 기준
-HISTORY_FILE = "sent_games.json"
+HISTORY_NS = "games"  # state_store 네임스페이스 (기존 sent_games.json)
 
 # 🌟 핵심: SteamOS 전용 '호환 가능(파란색)' 상태 추가
 STATUS_INFO = {
@@ -26,103 +29,111 @@ STATUS_INFO = {
 }
 
 PAGES_TO_SCAN = 2 
-# ==================================================
+# 딥 스캔: 0보다 크면 JSON 검색 결과를 이 개수(평가 많은 순)까지 병렬로 훑습니다. (0 = 기존 HTML 2페이지 방식)
+DEEP_SCAN_DEPTH = int(os.environ.get('DEEP_SCAN_DEPTH', 0))
+SEARCH_QUERY = {"sort_by": "Reviews_DESC", "category1": 998, "l": "koreana", "cc": "kr"}
+# 일괄 분류: 스팀덱 호환성 필터(3=Verified, 2=Playable, 1=Unsupported) 목록을 훑어 appid별 등급을 한 번에 구합니다.
+# 목록에 없는 게임만 게임별 호환성 API 로 확인합니다.
+BULK_CLASSIFY = os.environ.get('BULK_CLASSIFY', '1') == '1'
+BULK_CLASSIFY_DEPTH = int(os.environ.get('BULK_CLASSIFY_DEPTH', 5000))  # 등급별로 훑을 최대 게임 수
+BULK_CLASSIFY_MIN_APPS = 200  # 조회할 게임이 이보다 적으면 목록을 훑는 것보다 게임별 조회가 더 쌉니다.
+DECK_CATEGORIES = {3: "Verified", 2: "Playable", 1: "Unsupported"}
 
-def load_history():
-    if os.path.exists(HISTORY_FILE):
-        with open(HISTORY_FILE, "r", encoding='utf-8') as f:
-            try:
-                return json.load(f)
-            except:
-                return {}
-    return {}
+# 예전 형식(문자열) 기록을 갱신할 때 쓰는 appdetails 결과 캐시 (결과 종류별 유효 기간)
+APPDETAILS_NS = "appdetails"
+APPDETAILS_TTL = {
+    "game": 7 * 24 * 3600,
+    "not_game": 90 * 24 * 3600,     # DLC/사운드트랙 등 - 사실상 바뀌지 않음
+    "unavailable": 30 * 24 * 3600,  # 삭제/지역 제한으로 success=false
+    "failed": 6 * 3600              # 통신 에러 - 잠시 후 다시 시도
+}
 
-def save_history(history):
-    with open(HISTORY_FILE, "w", encoding='utf-8') as f:
-        json.dump(history, f, ensure_ascii=False)
+# 가격 감시: 추적 중인 게임의 가격을 여러 개씩 묶어(filters=price_overview) 조회하고 새 할인을 알립니다.
+# 호환성 채널이 할인 알림으로 덮이지 않도록 전용 웹훅(DISCORD_WEBHOOK_PRICE)이 있을 때만 켜집니다.
+PRICE_WEBHOOK_URL = os.environ.get('DISCORD_WEBHOOK_PRICE')
+PRICE_WATCH = bool(PRICE_WEBHOOK_URL) and os.environ.get('PRICE_WATCH', '1') == '1'
+PRICE_ALERT_LIMIT = int(os.environ.get('PRICE_ALERT_LIMIT', 10))  # 한 번에 보낼 최대 할인 알림 수 (큰 세일 대비)
+PRICE_NS = "prices"
+PRICE_BATCH_SIZE = 100    # 한 번에 조회할 appid 수
+PRICE_HISTORY_LIMIT = 20  # 게임별로 남길 가격 변동 기록 수
+COMPAT_WORKERS = int(os.environ.get('COMPAT_WORKERS', 8))  # 호환성 API 동시 요청 수
+# 업데이트 알림 방식: "edit" = 기존 메시지를 그 자리에서 수정 / "repost" = 기존 메시지 삭제 후 새로 전송
+UPDATE_MODE = "edit"
+# ==================================================
+
+def fetch_top_games_deep(depth=DEEP_SCAN_DEPTH):
+    """JSON 검색 결과를 병렬로 넘겨 가며 상위 depth 개 게임을 가져옵니다. 평가 수가 기준 미만이 되면 멈춥니다."""
+    games = {}
+    below_threshold = lambda rows: rows[-1]['reviews'] < MIN_REVIEWS
+    for rows in search_rows.iter_result_pages(SEARCH_QUERY, depth, stop=below_threshold):
+        for row in rows:
+            if row['reviews'] >= MIN_REVIEWS and row['id'] not in games:
+                games[row['id']] = {
+                    "id": row['id'],
+                    "title": row['title'],
+                    "link": row['link'],
+                    "reviews": row['reviews'],
+                    "sentiment": row['sentiment'],
+                    "price": row['price'],
+                    "img": row['img']
+                }
+    print(f"딥 스캔 완료: {len(games)}개 게임")
+    return list(games.values())
 
 def fetch_top_games():
     """스팀 검색 페이지에서 최상위 인기 게임 리스트를 가져옵니다."""
+    if DEEP_SCAN_DEPTH > 0:
+        return fetch_top_games_deep()
+
     games = []
     for page in range(PAGES_TO_SCAN):
         start_count = page * 50
         url = f"https://store.steampowered.com/search/?sort_by=Reviews_DESC&category1=998&l=koreana&cc=kr&start={start_count}"
         
         try:
-            response = requests.get(url, timeout=10)
+            response = http_cache.get(url, timeout=10)
             if response.status_code != 200:
                 break
             
-            soup = BeautifulSoup(response.text, "html.parser")
-            rows = soup.select("#search_resultsRows > a")
-            
+            rows = search_rows.extract_rows(response.text)
             if not rows: break
 
             for row in rows:
-                try:
-                    raw_appid = row.get('data-ds-appid')
-                    if not raw_appid: continue
-                    appid = raw_appid.split(',')[0]
-                    
-                    title = row.select_one(".title").text.strip()
-                    link = row.get('href', '')
-                    
-                    img_url = ""
-                    img_tag = row.select_one(".search_capsule img")
-                    if img_tag:
-                        img_url = img_tag.get('src')
-                        srcset = img_tag.get('srcset')
-                        if srcset:
-                            img_url = srcset.split(',')[0].split(' ')[0]
-                    
-                    if not img_url:
-                        img_url = f"https://cdn.cloudflare.steamstatic.com/steam/apps/{appid}/header.jpg"
-                    
-                    review_count = 0
-                    review_sentiment = "평가 없음"
-                    review_summary = row.select_one(".search_review_summary")
-                    if review_summary:
-                        raw_tooltip = review_summary.get('data-tooltip-html', '')
-                        parts = raw_tooltip.split('<br>')
-                        if parts: review_sentiment = parts[0].strip()
-                        match = re.search(r'([0-9,]+)개', raw_tooltip)
-                        if match: review_count = int(match.group(1).replace(',', ''))
-                    
-                    price_text = "가격 정보 없음"
-                    price_el = row.select_one(".discount_final_price") or row.select_one(".search_price")
-                    if price_el: price_text = price_el.text.strip()
-
-                    if review_count >= MIN_REVIEWS:
-                        games.append({
-                            "id": str(appid),
-                            "title": title,
-                            "link": link,
-                            "reviews": review_count,
-                            "sentiment": review_sentiment,
-                            "price": price_text,
-                            "img": img_url
-                        })
-                except: continue
+                if row['reviews'] >= MIN_REVIEWS:
+                    games.append({
+                        "id": row['id'],
+                        "title": row['title'],
+                        "link": row['link'],
+                        "reviews": row['reviews'],
+                        "sentiment": row['sentiment'],
+                        "price": row['price'],
+                        "img": row['img']
+                    })
             time.sleep(1)
         except: break
     return games
 
 def fetch_compatibilities_for_game(appid):
-    """스팀 비공개 API를 호출하고, 유저 경험칙에 맞게 기기별 호환성을 직관적으로 배분합니다."""
-    deck_status = "Unknown"
-    headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64)'}
+    """
+    스팀 비공개 API를 호출하고, 유저 경험칙에 맞게 기기별 호환성을 직관적으로 배분합니다.
+    요청 자체가 실패하면(네트워크 오류, JSON 이 아닌 응답) Unknown 과 구분할 수 있도록 None 을 돌려줍니다.
+    """
+    category = None
 
     try:
         deck_url = f"https://store.steampowered.com/saleaction/ajaxgetdeckappcompatibilityreport?nAppID={appid}"
-        res = requests.get(deck_url, headers=headers, timeout=5).json()
-        
-        if res and res.get("success") == 1:
-            category = res.get("results", {}).get("resolved_category")
-            if category == 3: deck_status = "Verified"
-            elif category == 2: deck_status = "Playable"
-            elif category == 1: deck_status = "Unsupported"
-    except:
-        pass
+        res = http_client.get(deck_url, timeout=5).json()
+    except Exception as e:
+        print(f"호환성 조회 실패 ({appid}): {e}")
+        return None
+
+    if res and res.get("success") == 1:
+        category = res.get("results", {}).get("resolved_category")
+    return status_from_category(category)
+
+def status_from_category(category):
+    """스팀덱 등급 코드(3/2/1)를 기기별 호환성으로 배분합니다."""
+    deck_status = DECK_CATEGORIES.get(category, "Unknown")
 
     machine_status = "Unknown"
     os_status = "Unknown"
@@ -139,23 +150,176 @@ def fetch_compatibilities_for_game(appid):
 
     return {"deck": deck_status, "machine": machine_status, "os": os_status}
 
+def classify_bulk(appids, depth=BULK_CLASSIFY_DEPTH):
+    """
+    호환성 필터가 걸린 검색 목록을 훑어 {appid: 등급 코드} 를 만듭니다.
+    목록은 평가 많은 순이라, 찾을 게임을 다 찾았거나 평가 수가 MIN_REVIEWS 아래로 내려가면 멈춥니다.
+    """
+    remaining = set(appids)
+    categories = {}
+
+    def done(rows):
+        return not remaining or rows[-1]['reviews'] < MIN_REVIEWS
+
+    for code in DECK_CATEGORIES:
+        if not remaining:
+            break
+        query = {"category1": 998, "deck_compatibility": code, "sort_by": "Reviews_DESC", "l": "koreana", "cc": "kr"}
+        for rows in search_rows.iter_result_pages(query, depth, stop=done):
+            for row in rows:
+                if row['id'] in remaining:
+                    categories[row['id']] = code
+                    remaining.discard(row['id'])
+    return categories
+
+def fetch_compatibilities(appids, workers=COMPAT_WORKERS):
+    """여러 게임의 호환성을 동시에 조회합니다. 결과는 입력한 appid 순서 그대로 돌려줍니다. (조회 실패는 None)"""
+    if not appids:
+        return []
+
+    use_bulk = BULK_CLASSIFY and len(appids) >= BULK_CLASSIFY_MIN_APPS
+    categories = classify_bulk(appids) if use_bulk else {}
+    if use_bulk:
+        hit_rate = len(categories) / len(appids) * 100
+        print(f"📊 일괄 분류 적중률: {len(categories)}/{len(appids)} ({hit_rate:.1f}%) - 나머지는 게임별 조회")
+
+    misses = [appid for appid in appids if appid not in categories]
+    fallback = {}
+    if misses:
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(misses)))) as executor:
+            fallback = dict(zip(misses, executor.map(fetch_compatibilities_for_game, misses)))
+
+    return [status_from_category(categories[appid]) if appid in categories else fallback[appid] for appid in appids]
+
+def fetch_appdetails(appid):
+    """appdetails 결과를 {"outcome", "game", "checked_at"} 로 정리해 돌려줍니다. 유효 기간 안이면 캐시를 씁니다."""
+    cached = state_store.get(APPDETAILS_NS, appid)
+    if cached and time.time() - cached['checked_at'] < APPDETAILS_TTL[cached['outcome']]:
+        return cached
+
+    result = {"outcome": "failed", "game": None, "checked_at": time.time()}
+    try:
+        res = http_client.get(f"https://store.steampowered.com/api/appdetails?appids={appid}&l=koreana&cc=kr", timeout=5).json()
+        entry = res.get(str(appid)) if res else None
+        if entry and entry.get('success'):
+            data = entry['data']
+            if data['type'] == 'game':
+                price = "무료"
+                if not data.get('is_free') and 'price_overview' in data:
+                    price = data['price_overview']['final_formatted']
+                result['outcome'] = "game"
+                result['game'] = {
+                    "id": str(appid),
+                    "title": data['name'],
+                    "link": f"https://store.steampowered.com/app/{appid}/",
+                    "reviews": 0,
+                    "sentiment": "기존 데이터 갱신",
+                    "price": price,
+                    "img": data.get('header_image', '')
+                }
+            else:
+                result['outcome'] = "not_game"
+        elif entry is not None:
+            result['outcome'] = "unavailable"
+    except Exception as e:
+        pass
+
+    state_store.upsert(APPDETAILS_NS, appid, result, commit=False)
+    return result
+
+def resolve_legacy_entries(appids, workers=COMPAT_WORKERS):
+    """예전 형식 기록들의 appdetails 를 동시에 조회합니다. 결과는 입력 순서 그대로입니다."""
+    if not appids:
+        return []
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(appids)))) as executor:
+        return list(executor.map(fetch_appdetails, appids))
+
+def fetch_price_batch(appids):
+    """여러 게임의 가격을 한 번에 조회합니다. {appid: price_overview 또는 None(무료/가격 없음)}"""
+    url = f"https://store.steampowered.com/api/appdetails?appids={','.join(appids)}&filters=price_overview&cc=kr"
+    try:
+        res = http_client.get(url, timeout=10).json() or {}
+    except Exception as e:
+        print(f"가격 조회 실패 ({len(appids)}개): {e}")
+        return {}
+
+    prices = {}
+    for appid in appids:
+        entry = res.get(appid)
+        if entry and entry.get('success'):
+            data = entry.get('data')
+            prices[appid] = data.get('price_overview') if isinstance(data, dict) else None
+    return prices
+
+def send_price_alert(appid, title, overview):
+    embed = DiscordEmbed(
+        title=f"💸 할인 시작: {title} (-{overview['discount_percent']}%)",
+        description=(
+            f"**가격:** ~~{overview.get('initial_formatted') or '-'}~~ → **{overview['final_formatted']}**\n"
+            f"[스팀 상점 페이지 바로가기](https://store.steampowered.com/app/{appid}/)"
+        ),
+        color='FF4500'
+    )
+    embed.set_image(url=search_rows.header_image(appid))
+    discord_queue.enqueue(PRICE_WEBHOOK_URL, [embed])
+
+def run_price_watch(workers=COMPAT_WORKERS):
+    """추적 중인 게임들의 가격을 묶음 조회해서 기록하고, 새로 시작된(또는 더 커진) 할인을 알립니다."""
+    tracked = {}
+    for appid, status in state_store.items(HISTORY_NS):
+        if isinstance(status, dict) and not status.get('resolved'):
+            tracked[appid] = status.get('title') or f"App {appid}"
+    appids = list(tracked)
+    batches = [appids[i:i + PRICE_BATCH_SIZE] for i in range(0, len(appids), PRICE_BATCH_SIZE)]
+    if not batches:
+        return
+
+    prices = {}
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(batches)))) as executor:
+        for result in executor.map(fetch_price_batch, batches):
+            prices.update(result)
+
+    now = int(time.time())
+    discounts = []
+    for appid, overview in prices.items():
+        if not overview:
+            continue
+        record = state_store.get(PRICE_NS, appid) or {"history": []}
+        history = record['history']
+        last = history[-1] if history else None
+        point = [now, overview['final'], overview['discount_percent']]
+
+        # 처음 보는 게임은 가격만 기록하고 알리지 않습니다.
+        if last and overview['discount_percent'] > last[2]:
+            discounts.append((appid, overview))
+
+        # 가격이 바뀐 경우에만 기록을 추가합니다.
+        if not last or last[1:] != point[1:]:
+            history.append(point)
+            record['history'] = history[-PRICE_HISTORY_LIMIT:]
+            state_store.upsert(PRICE_NS, appid, record, commit=False)
+
+    # 큰 세일 때 한꺼번에 쏟아지지 않도록 할인율이 큰 순서로 PRICE_ALERT_LIMIT 건만 알리고 나머지는 기록만 합니다.
+    discounts.sort(key=lambda item: item[1]['discount_percent'], reverse=True)
+    for appid, overview in discounts[:PRICE_ALERT_LIMIT]:
+        print(f"💸 할인: {tracked[appid]} (-{overview['discount_percent']}%)")
+        send_price_alert(appid, tracked[appid], overview)
+    skipped = max(0, len(discounts) - PRICE_ALERT_LIMIT)
+
+    state_store.commit()
+    print(f"가격 감시 완료: {len(prices)}/{len(appids)}개 조회 ({len(batches)}회 요청), "
+          f"할인 알림 {len(discounts) - skipped}건" + (f" (한도 초과로 {skipped}건은 기록만)" if skipped else ""))
+
 def send_discord_alert(game, new_status, old_status=None, is_update=False):
-    # 🌟 기존 메시지 교체(삭제) 로직 추가
-    if is_update and old_status and isinstance(old_status, dict) and old_status.get('message_id'):
-        old_msg_id = old_status['message_id']
-        try:
-            requests.delete(f"{WEBHOOK_URL}/messages/{old_msg_id}", timeout=10)
-            time.sleep(1)
-        except Exception as e:
-            print(f"기존 메시지 삭제 실패: {e}")
+    """알림을 전송 대기열에 넣고, 새 메시지 ID 를 결과로 주는 Future 를 돌려줍니다."""
+    old_msg_id = None
+    if is_update and old_status and isinstance(old_status, dict):
+        old_msg_id = old_status.get('message_id')
 
-    # 발송 후 메시지 ID를 응답받기 위한 wait 파라미터 추가
-    post_url = WEBHOOK_URL
-    if "wait=true" not in post_url.lower():
-        post_url += "&wait=true" if "?" in post_url else "?wait=true"
+    # 🌟 기존 메시지 교체(삭제) 로직 - 같은 대기열이라 삭제 후 전송 순서가 보장됩니다.
+    if old_msg_id and UPDATE_MODE == "repost":
+        discord_queue.enqueue_delete(WEBHOOK_URL, old_msg_id)
 
-    webhook = DiscordWebhook(url=post_url)
-    
     deck_info = STATUS_INFO.get(new_status['deck'], STATUS_INFO["Unknown"])
     machine_info = STATUS_INFO.get(new_status['machine'], STATUS_INFO["Unknown"])
     os_info = STATUS_INFO.get(new_status['os'], STATUS_INFO["Unknown"])
@@ -185,72 +349,66 @@ def send_discord_alert(game, new_status, old_status=None, is_update=False):
     if game.get('img'):
         embed.set_image(url=game['img'])
 
-    webhook.add_embed(embed)
-    
-    # 🌟 새 메시지 ID 추출 및 반환 방어 로직 적용
-    try:
-        response = webhook.execute()
-        new_message_id = None
-        if response.status_code in [200, 201]:
-            resp_json = response.json()
-            if isinstance(resp_json, list): new_message_id = resp_json[0].get('id')
-            else: new_message_id = resp_json.get('id')
-        return new_message_id
-    except Exception as e:
-        print(f"디스코드 웹훅 전송 실패: {e}")
-        return None
+    # 🌟 수정 모드면 기존 메시지를 그 자리에서 고칩니다. (메시지가 없으면 새로 전송)
+    if old_msg_id and UPDATE_MODE == "edit":
+        return discord_queue.enqueue_edit(WEBHOOK_URL, old_msg_id, [embed])
+
+    # 발송 후 메시지 ID를 응답받기 위해 wait=True 로 보냅니다.
+    return discord_queue.enqueue(WEBHOOK_URL, [embed], wait=True)
 
 def run():
     print("스팀 호환성 갱신 중 (JSON API + 메시지 대체 패치 적용)...")
-    history = load_history()
     top_games = fetch_top_games()
     
     unique_games = {g['id']: g for g in top_games}
     
-    old_appids = [appid for appid, status in history.items() if isinstance(status, str)]
-    for appid in old_appids:
-        if appid not in unique_games:
-            try:
-                res = requests.get(f"https://store.steampowered.com/api/appdetails?appids={appid}&l=koreana&cc=kr", timeout=5).json()
-                if res and str(appid) in res and res[str(appid)]['success']:
-                    data = res[str(appid)]['data']
-                    if data['type'] == 'game':
-                        price = "무료"
-                        if not data.get('is_free') and 'price_overview' in data:
-                            price = data['price_overview']['final_formatted']
-                        unique_games[appid] = {
-                            "id": str(appid),
-                            "title": data['name'],
-                            "link": f"https://store.steampowered.com/app/{appid}/",
-                            "reviews": 0,
-                            "sentiment": "기존 데이터 갱신",
-                            "price": price,
-                            "img": data.get('header_image', '')
-                        }
-            except Exception as e:
-                pass
-            time.sleep(0.5) 
+    # 🌟 예전 형식 기록 갱신: 동시에 조회하고, 게임이 아닌 항목은 다시 조회하지 않도록 최종 처리합니다.
+    old_appids = [appid for appid in state_store.legacy_keys(HISTORY_NS) if appid not in unique_games]
+    for appid, result in zip(old_appids, resolve_legacy_entries(old_appids)):
+        if result['outcome'] == "game":
+            unique_games[appid] = result['game']
+        elif result['outcome'] in ("not_game", "unavailable"):
+            state_store.upsert(HISTORY_NS, appid, {
+                "deck": "Unknown", "machine": "Unknown", "os": "Unknown", "resolved": result['outcome']
+            }, commit=False)
+    state_store.evict(APPDETAILS_NS, max_age=max(APPDETAILS_TTL.values()))
 
     sorted_games = sorted(unique_games.values(), key=lambda x: len(x['title']))
     processed_base_titles = set()
     
-    msg_count = 0
-    
+    # 🌟 같은 시리즈(기본 제목)는 가장 짧은 제목 하나만 조회 대상으로 남깁니다.
+    target_games = []
     for game in sorted_games:
-        appid = game['id']
-        
         base_title = game['title'].split(':')[0].split('-')[0].strip().lower()
         if base_title in processed_base_titles:
             continue
-            
-        old_status = history.get(appid)
-        current_status = fetch_compatibilities_for_game(appid)
+        processed_base_titles.add(base_title)
+        target_games.append(game)
+    
+    # 🌟 재확인 스케줄러: 마감된 게임만 예산 안에서 조회합니다. (기록이 없거나 예전 형식인 게임은 항상 조회)
+    target_ids = [g['id'] for g in target_games]
+    force = [appid for appid in target_ids if not isinstance(state_store.get(HISTORY_NS, appid), dict)]
+    due = recheck_scheduler.select_due(target_ids, force=force)
+    target_games = [g for g in target_games if g['id'] in due]
+    
+    # 🌟 호환성 조회는 동시에, 결과 처리(알림/저장)는 기존 순서대로 진행합니다.
+    statuses = fetch_compatibilities([g['id'] for g in target_games])
+    
+    msg_count = 0
+    pending = []  # (appid, 상태, 메시지 ID Future) - 전송이 끝나면 메시지 ID 를 기록
+    
+    for game, current_status in zip(target_games, statuses):
+        appid = game['id']
+        if current_status is None:
+            # 조회 실패는 변경으로 치지 않고 기록·스케줄을 그대로 둡니다. (마감 상태라 다음 실행에서 다시 조회)
+            continue
+        
+        old_status = state_store.get(HISTORY_NS, appid)
         
         # 🌟 기존 메시지 ID 계승
         if old_status and isinstance(old_status, dict) and old_status.get('message_id'):
             current_status['message_id'] = old_status['message_id']
-            
-        processed_base_titles.add(base_title)
+        current_status['title'] = game['title']  # 가격 감시 알림용
         
         is_legacy = isinstance(old_status, str)
         status_changed = False
@@ -263,40 +421,53 @@ def run():
                 old_status.get('os') != current_status['os']):
                 status_changed = True
         
+        recheck_scheduler.record(appid, current_status, status_changed)
+        
         if not old_status:
             if current_status['deck'] != "Unknown" or current_status['machine'] != "Unknown":
                 print(f"✨ 신규: {game['title']}")
-                new_msg_id = send_discord_alert(game, current_status, is_update=False)
-                if new_msg_id: current_status['message_id'] = new_msg_id
+                future = send_discord_alert(game, current_status, is_update=False)
+                pending.append((appid, current_status, future))
                 
-                history[appid] = current_status
+                state_store.upsert(HISTORY_NS, appid, current_status)
                 msg_count += 1
-                save_history(history)
-                time.sleep(3)
             else:
-                history[appid] = current_status
+                state_store.upsert(HISTORY_NS, appid, current_status, commit=False)
                 
         elif status_changed:
             if current_status['deck'] == "Unknown" and current_status['machine'] == "Unknown" and current_status['os'] == "Unknown":
+                # 예전 형식 기록은 알림 없이 새 구조로 바꿔서 다음 실행부터 다시 갱신 대상이 되지 않게 합니다.
+                if is_legacy:
+                    state_store.upsert(HISTORY_NS, appid, current_status, commit=False)
                 continue
                 
             print(f"🔄 업데이트 됨: {game['title']}")
-            new_msg_id = send_discord_alert(game, current_status, old_status=old_status, is_update=True)
-            if new_msg_id: current_status['message_id'] = new_msg_id
+            future = send_discord_alert(game, current_status, old_status=old_status, is_update=True)
+            pending.append((appid, current_status, future))
             
-            history[appid] = current_status
+            state_store.upsert(HISTORY_NS, appid, current_status)
             msg_count += 1
-            save_history(history)
-            time.sleep(3)
         else:
-            # 변경 사항이 없어도 전체 JSON 구조를 안전하게 유지
-            history[appid] = current_status
+            # 변경 사항이 없어도 최신 구조로 저장
+            state_store.upsert(HISTORY_NS, appid, current_status, commit=False)
             
+    # 🌟 대기열을 모두 보낸 뒤 새 메시지 ID 를 기록합니다.
+    discord_queue.flush()
+    for appid, current_status, future in pending:
+        new_msg_id = future.result()
+        if new_msg_id:
+            current_status['message_id'] = new_msg_id
+            state_store.upsert(HISTORY_NS, appid, current_status, commit=False)
+    
+    state_store.commit()
     if msg_count > 0:
-        save_history(history)
         print("모든 데이터 저장 완료.")
     else:
         print("새로 변경된 항목 없음.")
+    
+    if PRICE_WATCH:
+        run_price_watch()
+        discord_queue.flush()
 
 if __name__ == "__main__":
     run()
\ No newline at end of file
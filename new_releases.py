@@ -1,9 +1,9 @@
-import requests
-import json
+import state_store
+import discord_queue
+import search_rows
 import os
-import time
-from bs4 import BeautifulSoup
-from discord_webhook import DiscordWebhook, DiscordEmbed
+import re
+from discord_webhook import DiscordEmbed
 
 # ================= 설정 =================
 # 변수 이름이 맞는지 확인하세요 (NEWSALES)
@@ -13,88 +13,72 @@ if not WEBHOOK_URL:
     print("⚠️ 오류: 신작 알림용 웹훅 URL이 없습니다. Secrets 설정을 확인하세요.")
     exit()
 
-HISTORY_FILE = "sent_new_releases.json"
+HISTORY_NS = "new_releases"  # state_store 네임스페이스 (기존 sent_new_releases.json)
+CURSOR_NS = "release_cursor"   # 지금까지 본 가장 최근 출시일
+SEARCH_QUERY = {"sort_by": "Released_DESC", "category1": 998, "l": "koreana", "cc": "kr"}
+PAGE_SIZE = 50         # 한 번에 읽을 검색 결과 수
+MAX_CATCHUP = 500      # 한 번 실행에서 거슬러 올라갈 최대 개수
+FIRST_RUN_LIMIT = 15   # 기록이 하나도 없을 때(처음 실행) 보낼 최대 개수
+RELEASE_DATE_RE = re.compile(r'(\d{4})\s*년\s*(\d{1,2})\s*월\s*(\d{1,2})\s*일')
 # =======================================
 
-def load_history():
-    if os.path.exists(HISTORY_FILE):
-        with open(HISTORY_FILE, "r", encoding='utf-8') as f:
-            try:
-                return json.load(f)
-            except:
-                return []
-    return []
-
-def save_history(history):
-    with open(HISTORY_FILE, "w", encoding='utf-8') as f:
-        if len(history) > 500:
-            history = history[-500:]
-        json.dump(history, f, ensure_ascii=False)
+def parse_release_date(text):
+    """'2026년 10월 17일' 같은 출시일 문자열을 'YYYY-MM-DD' 로 바꿉니다. 알 수 없으면 None"""
+    match = RELEASE_DATE_RE.search(text or "")
+    if not match:
+        return None
+    year, month, day = (int(g) for g in match.groups())
+    return f"{year:04d}-{month:02d}-{day:02d}"
 
 def fetch_new_releases():
-    url = "https://store.steampowered.com/search/?sort_by=Released_DESC&category1=998&l=koreana&cc=kr"
+    """
+    출시일 최신순 검색 결과를 앞에서부터 한 페이지씩 읽으면서, 이미 보낸 게임이나
+    지난번 기준 출시일(cursor)보다 오래된 게임이 나오면 멈춥니다. 새 게임을 오래된 순으로 돌려줍니다.
+    새 게임이 없으면 첫 페이지 요청 한 번으로 끝납니다.
+    """
+    cursor = state_store.get(CURSOR_NS, "released")
+    first_run = cursor is None and state_store.count(HISTORY_NS) == 0
     
-    try:
-        response = requests.get(url, timeout=10)
-        if response.status_code != 200:
-            print(f"차단됨: {response.status_code}")
-            return []
-            
-        soup = BeautifulSoup(response.text, "html.parser")
-        rows = soup.select("#search_resultsRows > a")
+    games = []
+    newest = cursor
+    for start in range(0, MAX_CATCHUP, PAGE_SIZE):
+        rows = search_rows.fetch_results_page(SEARCH_QUERY, start, PAGE_SIZE)
+        if not rows:
+            if start == 0:
+                print("신작 목록을 가져오지 못했습니다.")
+            break
         
-        games = []
-        # 최신 15개 확인
-        for row in rows[:15]:
-            try:
-                # [수정 1] 앱 ID가 '123,456' 처럼 여러 개일 경우 첫 번째만 가져오기 (이미지 깨짐 방지)
-                raw_appid = row.get('data-ds-appid')
-                if not raw_appid: continue
-                appid = raw_appid.split(',')[0] 
-                
-                title = row.select_one(".title").text.strip()
-                link = row['href']
-                
-                price_text = "가격 정보 없음"
-                price_el = row.select_one(".discount_final_price") or row.select_one(".search_price")
-                if price_el:
-                    price_text = price_el.text.strip()
-                    if "Free" in price_text or "무료" in price_text: price_text = "무료"
-                
-                # [수정 2] 이미지를 더 확실하게 가져오기 (HTML 태그에서 직접 추출 시도)
-                img_url = ""
-                img_tag = row.select_one(".search_capsule img")
-                if img_tag:
-                    img_url = img_tag.get('src')
-                    # 고해상도 이미지가 있으면 그걸로 교체 (srcset)
-                    srcset = img_tag.get('srcset')
-                    if srcset:
-                        # "url 1x, url 2x" 형태이므로 2x(고화질) 우선 시도
-                        img_url = srcset.split(',')[0].split(' ')[0]
-                
-                # HTML에서 못 찾았으면 기본 URL 생성
-                if not img_url:
-                    img_url = f"https://cdn.cloudflare.steamstatic.com/steam/apps/{appid}/header.jpg"
-
-                games.append({
-                    "id": str(appid),
-                    "title": title,
-                    "link": link,
-                    "price": price_text,
-                    "img": img_url
-                })
-            except Exception as e:
+        reached = False
+        for row in rows:
+            released = parse_release_date(row['released'])
+            if released and (newest is None or released > newest):
+                newest = released
+            if state_store.is_seen(HISTORY_NS, row['id']):
+                reached = True  # 같은 페이지의 나머지 새 게임은 마저 확인합니다.
                 continue
-        
-        return games[::-1]
-        
-    except Exception as e:
-        print(f"에러 발생: {e}")
-        return []
+            if cursor and released and released < cursor:
+                reached = True
+                continue
+            games.append({
+                "id": row['id'],
+                "title": row['title'],
+                "link": row['link'],
+                "price": search_rows.normalize_price(row['price']),
+                "img": row['img']
+            })
+        if reached or first_run:
+            break
+
+    if first_run:
+        # 처음 실행이면 최신 몇 개만 알리고, 나머지는 알림 없이 본 것으로 기록해 다음 실행의 기준으로 씁니다.
+        for game in games[FIRST_RUN_LIMIT:]:
+            state_store.upsert(HISTORY_NS, game['id'], commit=False)
+        games = games[:FIRST_RUN_LIMIT]
+    if newest and newest != cursor:
+        state_store.upsert(CURSOR_NS, "released", newest, commit=False)
+    return games[::-1]
 
 def send_discord_alert(game):
-    webhook = DiscordWebhook(url=WEBHOOK_URL)
-    
     embed = DiscordEmbed(title=f"🆕 스팀 신작 출시: {game['title']}", 
                          description=f"**가격:** {game['price']}\n[상점 페이지 구경하기]({game['link']})", 
                          color='00b0f4')
@@ -103,27 +87,25 @@ def send_discord_alert(game):
     if game['img']:
         embed.set_image(url=game['img'])
         
-    webhook.add_embed(embed)
-    webhook.execute()
+    discord_queue.enqueue(WEBHOOK_URL, [embed])
 
 def run():
     print("신작 스캔 시작...")
-    history = load_history()
     new_games = fetch_new_releases()
     
-    updated_history = history[:]
     msg_count = 0
     
     for game in new_games:
-        if game['id'] not in history:
+        if not state_store.is_seen(HISTORY_NS, game['id']):
             print(f"발견: {game['title']}")
             send_discord_alert(game)
-            updated_history.append(game['id'])
+            state_store.mark_seen(HISTORY_NS, game['id'])
             msg_count += 1
-            time.sleep(1)
             
+    discord_queue.flush()
+    state_store.commit()
     if msg_count > 0:
-        save_history(updated_history)
+        state_store.evict(HISTORY_NS, keep_latest=500)
         print("업데이트 완료.")
     else:
         print("새로운 신작 없음.")
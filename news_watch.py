@@ -0,0 +1,196 @@
+import os
+import re
+import sys
+import json
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from discord_webhook import DiscordEmbed
+import http_cache
+import state_store
+import discord_queue
+
+# ================= 설정 =================
+# 여러 스팀 앱의 뉴스를 한 번에 감시하는 공용 엔진입니다. (check_steamos, check_sales 가 씁니다)
+# 감시 항목(watch) 하나는 아래 키를 가진 dict 입니다.
+#   topic       : 이름 (로그용, history_ns 기본값에도 씀)
+#   appids      : 감시할 appid 목록
+#   keywords    : 제목에 하나라도 들어 있어야 하는 단어 (비우면 전부 통과)
+#   exclude     : 제목에 들어 있으면 버리는 단어
+#   history_ns  : 보낸 gid 를 기록할 state_store 네임스페이스
+#   maxlength   : 본문 최대 길이 (0 = 전체, 제목/링크만 필요하면 작게 해서 응답 크기를 줄입니다)
+#   count       : 앱당 가져올 뉴스 개수
+#   keep_latest : 기록을 이 개수만 남기고 정리 (없으면 정리 안 함)
+#   handler     : handler(watch, items) - 새 뉴스 목록(오래된 순)을 받아 알림을 보냅니다.
+#   webhook     : 핸들러가 쓸 웹훅 URL
+#   backfill_pages : cursor 가 없을 때(처음 실행) 거슬러 올라갈 페이지 수
+NEWS_URL = "https://api.steampowered.com/ISteamNews/GetNewsForApp/v2/"
+FETCH_WORKERS = 8
+DEFAULT_COUNT = 10
+MAX_PAGES = 20       # 한 번에 거슬러 올라갈 최대 페이지 수 (무한 반복 방지)
+BACKFILL_PAGES = int(os.environ.get('NEWS_BACKFILL_PAGES', 1))
+CURSOR_NS = "news_cursor"  # 감시 항목·앱별로 마지막으로 본 가장 새 글 {"date", "gids"}
+# =======================================
+
+def compile_matcher(keywords, exclude=()):
+    """키워드/제외어를 정규식 하나씩으로 미리 컴파일해서 제목 검사 함수를 돌려줍니다. (대소문자 무시)"""
+    include_re = re.compile("|".join(re.escape(k) for k in keywords), re.IGNORECASE) if keywords else None
+    exclude_re = re.compile("|".join(re.escape(k) for k in exclude), re.IGNORECASE) if exclude else None
+
+    def matches(title):
+        if exclude_re is not None and exclude_re.search(title):
+            return False
+        return include_re is None or include_re.search(title) is not None
+    return matches
+
+def fetch_news(appid, count=DEFAULT_COUNT, maxlength=0, enddate=None):
+    """앱 하나의 뉴스 한 페이지 (최신순). enddate 를 주면 그 시각 이전 글만 받습니다. 실패하면 None"""
+    params = {"appid": appid, "count": count, "maxlength": maxlength, "format": "json"}
+    if enddate is not None:
+        params['enddate'] = enddate
+    try:
+        # 304 여도 저장된 본문을 그대로 씁니다. (지난번에 처리하다 실패한 글이 남아 있을 수 있으므로)
+        response = http_cache.get(NEWS_URL, params=params, timeout=10)
+        return response.json()['appnews']['newsitems']
+    except Exception as e:
+        print(f"뉴스 가져오기 실패 ({appid}): {e}")
+        return None
+
+_pages_lock = threading.Lock()
+
+def fetch_page(pages, appid, count=DEFAULT_COUNT, maxlength=0, enddate=None):
+    """
+    fetch_news 와 같지만 pages(한 실행 동안 쓰는 dict) 에 결과를 남겨서,
+    여러 감시 항목이 같은 앱을 같은 조건으로 보면 (appid, count, maxlength, enddate) 마다 한 번만 요청합니다.
+    다른 스레드가 이미 받는 중이면 그 결과를 기다립니다.
+    """
+    key = (appid, count, maxlength, enddate)
+    with _pages_lock:
+        future = pages.get(key)
+        owner = future is None
+        if owner:
+            future = pages[key] = Future()
+    if owner:
+        future.set_result(fetch_news(*key))
+    return future.result()
+
+def _cursor_key(watch, appid):
+    return f"{watch['history_ns']}:{appid}"
+
+def iter_news_since(appid, cursor, count=DEFAULT_COUNT, maxlength=0, max_pages=MAX_PAGES, pages=None):
+    """
+    cursor({"date", "gids"}) 보다 새 글을 최신순으로 하나씩 돌려줍니다.
+    한 페이지가 전부 새 글이면 enddate 로 더 오래된 페이지를 이어서 받으므로, 실행 사이에 글이 많이 올라와도 빠지지 않습니다.
+    cursor 가 없으면(처음 실행) max_pages 페이지까지만 받습니다. pages 를 주면 같은 페이지는 한 번만 받습니다. (fetch_page)
+    """
+    seen_gids = set()
+    enddate = None
+    for _ in range(max_pages):
+        if pages is None:
+            page = fetch_news(appid, count, maxlength, enddate)
+        else:
+            page = fetch_page(pages, appid, count, maxlength, enddate)
+        if not page:
+            return
+        fresh = 0
+        for item in page:
+            if item['gid'] in seen_gids:
+                continue
+            if cursor and (item['date'] < cursor['date'] or
+                           (item['date'] == cursor['date'] and item['gid'] in cursor['gids'])):
+                return
+            seen_gids.add(item['gid'])
+            fresh += 1
+            yield item
+        if len(page) < count:
+            return
+        oldest = min(item['date'] for item in page)
+        # 같은 시각의 글이 한 페이지를 넘게 있으면 enddate 가 제자리이므로 1초 앞으로 넘깁니다.
+        enddate = oldest if fresh else oldest - 1
+
+def collect(watch, appid, pages=None):
+    """(키워드에 맞고 아직 보내지 않은 글 목록, 새 cursor) - 스레드에서 앱 하나씩 실행됩니다."""
+    cursor = state_store.get(CURSOR_NS, _cursor_key(watch, appid))
+    max_pages = MAX_PAGES if cursor else watch.get('backfill_pages', BACKFILL_PAGES)
+    newest = None
+    items = []
+    for item in iter_news_since(appid, cursor, watch.get('count', DEFAULT_COUNT), watch.get('maxlength', 0), max_pages, pages):
+        if newest is None or item['date'] > newest['date']:
+            newest = {"date": item['date'], "gids": [item['gid']]}
+        elif item['date'] == newest['date']:
+            newest['gids'].append(item['gid'])
+        if watch['_matcher'](item['title']) and not state_store.is_seen(watch['history_ns'], item['gid']):
+            items.append(item)
+    return items, newest
+
+def run(watches):
+    """모든 감시 항목을 한 번 훑어서 새 뉴스를 핸들러로 보냅니다. 보낸 개수를 돌려줍니다."""
+    jobs = []
+    for watch in watches:
+        watch.setdefault('history_ns', f"news_{watch['topic']}")
+        watch['_matcher'] = compile_matcher(watch.get('keywords', []), watch.get('exclude', []))
+        jobs.extend((watch, appid) for appid in watch['appids'])
+    if not jobs:
+        return 0
+
+    # 감시 항목끼리 겹치는 앱은 같은 조건의 페이지를 한 번만 받습니다. (cursor 는 감시 항목마다 따로)
+    pages = {}
+    with ThreadPoolExecutor(max_workers=min(FETCH_WORKERS, len(jobs))) as executor:
+        results = list(executor.map(lambda job: collect(*job, pages), jobs))
+
+    total = 0
+    for watch in watches:
+        watch_results = [(appid, result) for (w, appid), result in zip(jobs, results) if w is watch]
+        items = sorted((item for _, (found, _) in watch_results for item in found), key=lambda item: item['date'])
+        if items:
+            print(f"[{watch['topic']}] 새 소식 {len(items)}건")
+            watch['handler'](watch, items)
+            for item in items:
+                state_store.upsert(watch['history_ns'], item['gid'], commit=False)
+            if watch.get('keep_latest'):
+                state_store.evict(watch['history_ns'], keep_latest=watch['keep_latest'])
+            total += len(items)
+        # 핸들러까지 끝난 뒤에 cursor 를 옮깁니다.
+        for appid, (_, newest) in watch_results:
+            if newest:
+                state_store.upsert(CURSOR_NS, _cursor_key(watch, appid), newest, commit=False)
+        state_store.commit()
+
+    discord_queue.flush()
+    return total
+
+# ---------------- 설정 파일로 실행 ----------------
+# python news_watch.py watches.json
+# [{"topic": "patches", "appids": [1091500, 1245620], "keywords": ["Patch", "Update"],
+#   "webhook_env": "DISCORD_WEBHOOK_PATCHES", "handler": "simple", "maxlength": 1}, ...]
+
+def send_simple(watch, items):
+    """제목과 링크만 보내는 기본 핸들러"""
+    for item in items:
+        embed = DiscordEmbed(
+            title=f"📰 {item['title']}",
+            description=f"[👉 원문 보기]({item['url']})",
+            color='1B2838'
+        )
+        discord_queue.enqueue(watch['webhook'], [embed])
+
+HANDLERS = {"simple": send_simple}
+
+def load_watches(path):
+    with open(path, "r", encoding='utf-8') as f:
+        config = json.load(f)
+    watches = []
+    for entry in config:
+        webhook = os.environ.get(entry.get('webhook_env', ''))
+        if not webhook:
+            print(f"⚠️ [{entry.get('topic')}] 웹훅 URL({entry.get('webhook_env')})이 없어서 건너뜁니다.")
+            continue
+        watch = dict(entry, webhook=webhook, handler=HANDLERS[entry.get('handler', 'simple')])
+        watches.append(watch)
+    return watches
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("사용법: python news_watch.py <설정 파일.json>")
+        sys.exit(1)
+    count = run(load_watches(sys.argv[1]))
+    print(f"완료: 새 소식 {count}건")
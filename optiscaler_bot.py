@@ -1,12 +1,20 @@
-import requests
-import json
+import http_client
+import http_cache
+import state_store
+import discord_queue
+import translation_cache
+import wiki_mirror
+import app_index
+import optiscaler_parse
 import os
 import time
 import re
 import urllib.parse
-from bs4 import BeautifulSoup
-from discord_webhook import DiscordWebhook, DiscordEmbed
-from deep_translator import GoogleTranslator
+import json
+import hashlib
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from discord_webhook import DiscordEmbed
 
 # ================= 설정 =================
 WEBHOOK_URL = os.environ.get('DISCORD_WEBHOOK_OPTISCALER')
@@ -15,39 +23,39 @@ if not WEBHOOK_URL:
     print("⚠️ 오류: 옵티스케일러 알림용 웹훅 URL이 없습니다.")
     exit()
 
-HISTORY_FILE = "optiscaler_games.json"
+HISTORY_NS = "optiscaler"  # state_store 네임스페이스 (기존 optiscaler_games.json)
 BASE_WIKI_URL = "https://raw.githubusercontent.com/wiki/optiscaler/OptiScaler"
+# 업데이트 알림 방식: "edit" = 기존 메시지를 그 자리에서 수정 / "repost" = 기존 메시지 삭제 후 새로 전송
+UPDATE_MODE = "edit"
+# 위키 저장소를 로컬에 복제해 두고 git blob 해시가 바뀐 상세 페이지만 다시 받아옵니다. (0 = 매번 전체 조회)
+WIKI_MIRROR = os.environ.get('OPTISCALER_WIKI_MIRROR', '1') == '1'
+PAGES_NS = "optiscaler_pages"  # 위키 페이지별 {blob 해시, 상세 정보} 저장소
+# 미러에 없는 상세 페이지(미러를 못 쓰면 전부) 중 표가 그대로인 게임을 이번 실행에서 다시 확인할 개수 (오래 확인 안 한 순)
+REVERIFY_PER_RUN = int(os.environ.get('OPTISCALER_REVERIFY', 20))
+DETAIL_WORKERS = int(os.environ.get('OPTISCALER_DETAIL_WORKERS', 8))  # 상세 페이지 동시 요청 수
+PARSE_WORKERS = os.cpu_count() or 1  # 파싱 프로세스 수
+PARSE_POOL_MIN = 20  # 파싱할 페이지가 이보다 적으면 프로세스를 띄우지 않고 바로 파싱합니다.
 # =======================================
 
-def load_history():
-    if os.path.exists(HISTORY_FILE):
-        with open(HISTORY_FILE, "r", encoding='utf-8') as f:
-            try: return json.load(f)
-            except: return {}
-    return {}
-
-def save_history(history):
-    with open(HISTORY_FILE, "w", encoding='utf-8') as f:
-        json.dump(history, f, ensure_ascii=False)
-
-def translate_ko(text):
-    if not text:
-        return ""
-    text_str = str(text)
-    if len(text_str) < 2 or text_str.lower() in ["none", "n/a"]:
-        return text_str
-    try:
-        translator = GoogleTranslator(source='en', target='ko')
-        result = translator.translate(text_str)
-        return str(result) if result else text_str
-    except:
-        return text_str
+def translate_ko(texts):
+    """메모 여러 개를 한 번에 번역합니다. (캐시에 없는 문장만 동시에 번역)"""
+    texts = [str(text) if text else "" for text in texts]
+    targets = [text for text in texts if len(text) >= 2 and text.lower() not in ["none", "n/a"]]
+    if not targets:
+        return texts
+    translated = dict(zip(targets, translation_cache.translate_many(targets, source='en', target='ko')))
+    return [translated.get(text, text) for text in texts]
 
 def get_steam_korean_name(eng_name):
     search_term = eng_name.split('(')[0].strip()
+    # 로컬 앱 색인에서 먼저 찾고, 한국어 이름을 얻지 못했을 때만 스토어 검색을 씁니다.
+    found = app_index.lookup(search_term)
+    if found and found.get('kor_name'):
+        return found['kor_name']
+
     url = f"https://store.steampowered.com/api/storesearch/?term={urllib.parse.quote(search_term)}&l=korean&cc=kr"
     try:
-        res = requests.get(url, timeout=5)
+        res = http_client.get(url, timeout=5)
         if res.status_code == 200:
             data = res.json()
             if data.get('total', 0) > 0:
@@ -58,144 +66,222 @@ def get_steam_korean_name(eng_name):
         print(f"스팀 API 검색 에러: {e}")
     return None
 
-def parse_main_table():
-    url = f"{BASE_WIKI_URL}/Compatibility-List.md"
-    try:
-        res = requests.get(url, timeout=10)
-        if res.status_code != 200: return {}
+# 메인 표 파싱용 정규식 (한 번만 컴파일)
+TABLE_SEPARATOR_RE = re.compile(r'\|[-:\s]+\|[-:\s]+\|')
+# 🌟 핵심 수정: 주소 내부에 괄호가 포함되어 있어도 마크다운의 '진짜 끝 괄호'를 정확히 찾아냅니다.
+MD_LINK_RE = re.compile(r'\[(.*?)\]\((.*?)\)(?!\))')
+HREF_RE = re.compile(r'href=["\'](.*?)["\']')
+
+ROW_FIELDS = ('status', 'native_api', 'optipatcher', 'table_image')
+DETAIL_FIELDS = ('image', 'notes', 'dll', 'upscaler_input', 'fg_input')
+
+def fingerprint(*values):
+    """값 묶음의 안정적인 해시 - 같은 내용이면 실행할 때마다 같은 값이 나옵니다."""
+    return hashlib.sha1(json.dumps(values, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+def iter_main_table(lines):
+    """표 줄을 하나씩 읽으면서 게임 행을 돌려줍니다. 전체 문서를 한꺼번에 나누지 않습니다."""
+    for line in lines:
+        if not line.lstrip().startswith('|'):
+            continue
+        if TABLE_SEPARATOR_RE.search(line):
+            continue
+            
+        cols = [c.strip() for c in line.split('|')][1:-1]
+        if len(cols) < 4:
+            continue
+        raw_game = cols[0]
+        status = cols[1]
+        native_api = cols[2]
+        optipatcher = cols[3] 
         
-        lines = res.text.split('\n')
-        games = {}
+        if "GAME NAME" in raw_game.upper() or "Game" in raw_game:
+            continue
+        if not raw_game or all(c in '-:' for c in raw_game):
+            continue
         
-        for line in lines:
-            if not line.strip().startswith('|'):
-                continue
-            if re.search(r'\|[-:\s]+\|[-:\s]+\|', line):
-                continue
-                
-            cols = [c.strip() for c in line.split('|')][1:-1]
-            if len(cols) >= 4:
-                raw_game = cols[0]
-                status = cols[1]
-                native_api = cols[2]
-                optipatcher = cols[3] 
-                
-                if "GAME NAME" in raw_game.upper() or "Game" in raw_game:
-                    continue
-                if not raw_game or all(c in '-:' for c in raw_game):
-                    continue
-                
-                table_image = ""
-                if len(cols) >= 6:
-                    # 🌟 이미지 링크도 괄호 방어 적용
-                    img_match = re.search(r'\[.*?\]\((.*?)\)(?!\))', cols[5])
-                    if img_match:
-                        table_image = img_match.group(1).strip()
-                
-                # 🌟 핵심 수정: 주소 내부에 괄호가 포함되어 있어도 마크다운의 '진짜 끝 괄호'를 정확히 찾아냅니다.
-                match = re.search(r'\[(.*?)\]\((.*?)\)(?!\))', raw_game)
-                if match:
-                    game_name = match.group(1).replace('*', '').strip()
-                    detail_link = match.group(2).strip()
-                else:
-                    game_link_match = re.search(r'href=["\'](.*?)["\']', raw_game)
-                    if game_link_match:
-                        detail_link = game_link_match.group(1).split('/')[-1]
-                    else:
-                        detail_link = None
-                    game_name = raw_game.replace('*', '').strip()
-                
-                games[game_name] = {
-                    "name": game_name,
-                    "status": status,
-                    "native_api": native_api,
-                    "optipatcher": optipatcher,
-                    "detail_link": detail_link,
-                    "table_image": table_image
-                }
-        return games
+        table_image = ""
+        if len(cols) >= 6:
+            # 🌟 이미지 링크도 괄호 방어 적용
+            img_match = MD_LINK_RE.search(cols[5])
+            if img_match:
+                table_image = img_match.group(2).strip()
+        
+        match = MD_LINK_RE.search(raw_game)
+        if match:
+            game_name = match.group(1).replace('*', '').strip()
+            detail_link = match.group(2).strip()
+        else:
+            game_link_match = HREF_RE.search(raw_game)
+            if game_link_match:
+                detail_link = game_link_match.group(1).split('/')[-1]
+            else:
+                detail_link = None
+            game_name = raw_game.replace('*', '').strip()
+        
+        game = {
+            "name": game_name,
+            "status": status,
+            "native_api": native_api,
+            "optipatcher": optipatcher,
+            "detail_link": detail_link,
+            "table_image": table_image
+        }
+        game['row_fp'] = fingerprint(detail_link, *(game[f] for f in ROW_FIELDS))
+        yield game
+
+def parse_main_table(lines=None):
+    """메인 표를 {게임 이름: 행} 으로 읽습니다. lines 가 없으면 위키 원문을 받아옵니다."""
+    url = f"{BASE_WIKI_URL}/Compatibility-List.md"
+    try:
+        if lines is None:
+            res = http_cache.get(url, timeout=10)
+            if res.status_code != 200: return {}
+            lines = res.text.splitlines()
+        return {game['name']: game for game in iter_main_table(lines)}
     except Exception as e:
         print(f"메인 표 파싱 에러: {e}")
         return {}
 
-def fetch_detail_page(link):
+def fetch_detail_source(link):
+    """
+    상세 페이지 원문을 받아옵니다. (종류, 내용) - optiscaler_parse.parse_source 에 그대로 넘길 수 있습니다.
+    위키 원문(.md)을 먼저 받고, 실패하면 렌더링된 깃허브 페이지로 대체합니다.
+    """
     if not link: 
-        return {"success": True, "image": "", "notes": "", "dll": "", "upscaler_input": "", "fg_input": ""}
-    
-    if "github.com/" in link:
-        page_path = link.split('/wiki/')[-1]
-    else:
-        page_path = link
-        
-    page_path = page_path.split('#')[0].strip()
-    page_path = urllib.parse.quote(page_path)
-    url = f"https://github.com/optiscaler/OptiScaler/wiki/{page_path}"
+        return "details", optiscaler_parse.empty_details()
     
+    page_path = urllib.parse.quote(wiki_mirror.page_name(link))
+    try:
+        res = http_cache.get(f"{BASE_WIKI_URL}/{page_path}.md", timeout=10)
+        if res.status_code == 200:
+            return "md", res.text
+    except Exception as e:
+        print(f"위키 원문 조회 실패, 렌더링 페이지로 대체: {e}")
+
     try:
-        res = requests.get(url, timeout=10)
+        res = http_client.get(f"https://github.com/optiscaler/OptiScaler/wiki/{page_path}", timeout=10)
         if res.status_code == 404: 
-            return {"success": True, "image": "", "notes": "", "dll": "", "upscaler_input": "", "fg_input": ""}
+            return "details", optiscaler_parse.empty_details()
         elif res.status_code != 200: 
-            return {"success": False, "error_msg": f"⚠️ 통신 에러 (HTTP {res.status_code})"}
-            
-        soup = BeautifulSoup(res.text, 'html.parser')
-        body = soup.find('div', class_='markdown-body')
-        
-        extracted_dll = ""
-        upscaler_input = ""
-        fg_input = ""
-        notes_lines = []
-        
-        if body:
-            for table in body.find_all('table'):
-                for row in table.find_all('tr'):
-                    cols = row.find_all(['th', 'td'])
-                    if len(cols) >= 2:
-                        key = cols[0].get_text(strip=True).lower()
-                        val = cols[1].get_text(separator=" ", strip=True)
-                        if 'filename' in key: extracted_dll = val
-                        elif 'upscaler input' in key: upscaler_input = val
-                        elif 'fg input' in key: fg_input = val
-                            
-            for child in body.children:
-                if child.name == 'p':
-                    text = child.get_text(separator=" ", strip=True)
-                    if text: notes_lines.append(text)
-                elif child.name == 'ul':
-                    for li in child.find_all('li', recursive=False):
-                        text = li.get_text(separator=" ", strip=True)
-                        if text: notes_lines.append(f"- {text}")
-                        
-        clean_text = "\n".join(notes_lines).strip()
-        if len(clean_text) > 400:
-            clean_text = clean_text[:400] + "...\n(상세 페이지 참조)"
-            
-        return {
-            "success": True,
-            "image": "", 
-            "notes": clean_text, 
-            "dll": extracted_dll,
-            "upscaler_input": upscaler_input,
-            "fg_input": fg_input
-        }
+            return "details", {"success": False, "error_msg": f"⚠️ 통신 에러 (HTTP {res.status_code})"}
+        return "html", res.text
     except Exception as e:
-        return {"success": False, "error_msg": f"⚠️ 파싱 에러 발생: {e}"}
+        return "details", {"success": False, "error_msg": f"⚠️ 파싱 에러 발생: {e}"}
+
+def fetch_detail_page(link):
+    return optiscaler_parse.parse_source(*fetch_detail_source(link))
 
-def send_discord_alert(game, old_game=None, is_update=False):
-    if is_update and old_game and old_game.get('message_id'):
-        old_msg_id = old_game['message_id']
+def load_mirror():
+    """위키 미러를 동기화하고 {소문자 페이지 이름: (경로, blob 해시)} 를 돌려줍니다. 실패하면 None"""
+    if not WIKI_MIRROR or not wiki_mirror.sync():
+        return None
+    try:
+        return wiki_mirror.blob_hashes()
+    except Exception as e:
+        print(f"위키 미러 읽기 실패: {e}")
+        return None
+
+def load_source(link, mirror_pages):
+    """
+    상세 정보의 원문을 구합니다. (종류, 내용, 미러 페이지 키, blob 해시)
+    미러에 있는 페이지는 blob 해시가 저장된 값과 같으면 저장된 결과를 그대로 쓰고,
+    바뀐 페이지는 네트워크 없이 미러의 원문을 읽습니다. 미러에 없는 페이지는 네트워크로 받아옵니다.
+    """
+    key = mirror_key(link, mirror_pages)
+    if key:
+        path, blob = mirror_pages[key]
+        cached = state_store.get(PAGES_NS, key)
+        if cached and cached.get('blob') == blob:
+            return "details", cached['details'], None, None
         try:
-            requests.delete(f"{WEBHOOK_URL}/messages/{old_msg_id}", timeout=10)
-            time.sleep(1) 
+            return "md", wiki_mirror.read_page(path), key, blob
         except Exception as e:
-            print(f"기존 메시지 삭제 실패: {e}")
+            print(f"미러 페이지 읽기 실패 ({path}): {e}")
+    return fetch_detail_source(link) + (None, None)
+
+def mirror_key(link, mirror_pages):
+    """상세 페이지가 미러에 있으면 그 키(소문자 페이지 이름), 없으면 None"""
+    page = wiki_mirror.page_name(link)
+    if mirror_pages is None or not page:
+        return None
+    key = page.lower()
+    return key if key in mirror_pages else None
+
+def page_changed(link, mirror_pages):
+    """미러에 있는 상세 페이지의 blob 해시가 저장된 결과와 다른지"""
+    key = mirror_key(link, mirror_pages)
+    if not key:
+        return False
+    cached = state_store.get(PAGES_NS, key)
+    return not cached or cached.get('blob') != mirror_pages[key][1]
+
+def _parse_pool(count):
+    """
+    파싱할 페이지가 충분히 많을 때만 프로세스 풀을 만듭니다. 만들 수 없으면 None
+    작업 프로세스는 받아오기 스레드가 도는 중에 생기므로, 스레드가 있는 프로세스를 fork 하지 않도록
+    forkserver(없으면 spawn) 방식으로 띄웁니다.
+    """
+    if count < PARSE_POOL_MIN or PARSE_WORKERS < 2:
+        return None
+    try:
+        method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        return ProcessPoolExecutor(max_workers=PARSE_WORKERS, mp_context=multiprocessing.get_context(method))
+    except Exception as e:
+        print(f"프로세스 풀 생성 실패, 현재 프로세스에서 파싱합니다: {e}")
+        return None
+
+def load_details_bulk(links, mirror_pages):
+    """
+    links 순서대로 상세 정보를 돌려줍니다.
+    받아오기는 스레드(DETAIL_WORKERS 개 동시 연결)가, 파싱은 프로세스 풀이 맡고,
+    받아 온 페이지는 다른 페이지를 기다리지 않고 바로 파싱 단계로 넘어갑니다.
+    여러 게임이 같은 페이지를 가리키면 (예: Luma-Unreal-Engine) 한 번만 받아서 파싱하고 결과를 나눠 씁니다.
+    """
+    if not links:
+        return []
+    unique_links = list(dict.fromkeys(links))
+    results = [None] * len(unique_links)
+    parse_futures = {}
+    pool = _parse_pool(len(unique_links))
+    try:
+        with ThreadPoolExecutor(max_workers=min(DETAIL_WORKERS, len(unique_links))) as fetchers:
+            fetch_futures = {fetchers.submit(load_source, link, mirror_pages): i for i, link in enumerate(unique_links)}
+            for future in as_completed(fetch_futures):
+                i = fetch_futures[future]
+                kind, content, key, blob = future.result()
+                if kind == "details":
+                    results[i] = content
+                elif pool is not None:
+                    parse_futures[i] = (pool.submit(optiscaler_parse.parse_source, kind, content), key, blob)
+                else:
+                    parse_futures[i] = (optiscaler_parse.parse_source(kind, content), key, blob)
+
+        for i, (parsed, key, blob) in parse_futures.items():
+            details = parsed.result() if pool is not None else parsed
+            results[i] = details
+            if key and details.get('success'):
+                state_store.upsert(PAGES_NS, key, {"blob": blob, "details": details}, commit=False)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    by_link = dict(zip(unique_links, results))
+    return [by_link[link] for link in links]
+
+def prune_pages(mirror_pages):
+    """위키에서 사라진 페이지의 저장 결과를 지웁니다."""
+    if mirror_pages is None:
+        return
+    for key, _ in list(state_store.items(PAGES_NS)):
+        if key not in mirror_pages:
+            state_store.delete(PAGES_NS, key)
+
+def send_discord_alert(game, old_game=None, is_update=False, ko_notes=""):
+    """알림을 전송 대기열에 넣고, 새 메시지 ID 를 결과로 주는 Future 를 돌려줍니다. (ko_notes: 번역된 메모)"""
+    old_msg_id = old_game.get('message_id') if is_update and old_game else None
+    if old_msg_id and UPDATE_MODE == "repost":
+        discord_queue.enqueue_delete(WEBHOOK_URL, old_msg_id)
 
-    post_url = WEBHOOK_URL
-    if "wait=true" not in post_url.lower():
-        post_url += "&wait=true" if "?" in post_url else "?wait=true"
-        
-    webhook = DiscordWebhook(url=post_url)
-    
     status_raw = game['status']
     if 'working' in status_raw.lower() or '✔' in status_raw or '✅' in status_raw:
         icon = "🟢"
@@ -259,7 +345,6 @@ def send_discord_alert(game, old_game=None, is_update=False):
     else: fg_text = "**🚀 프레임 생성(FG) 인풋:** 미지원 / 정보 없음"
         
     native_api_text += mark_api
-    ko_notes = str(translate_ko(game.get('notes', '')))
     notes_block = f"\n\n**📝 세부 설정 및 이슈**{mark_notes}\n{ko_notes}" if ko_notes else ""
     
     if game.get('detail_link'):
@@ -297,67 +382,83 @@ def send_discord_alert(game, old_game=None, is_update=False):
         embed.set_image(url=final_img)
         
     embed.set_footer(text="데이터 제공 (Developed & Maintained by): OptiScaler Team")
-    webhook.add_embed(embed)
-    
-    try:
-        response = webhook.execute()
-        new_message_id = None
-        if response.status_code in [200, 201]:
-            resp_json = response.json()
-            if isinstance(resp_json, list): new_message_id = resp_json[0].get('id')
-            else: new_message_id = resp_json.get('id')
-        return new_message_id
-    except Exception as e:
-        print(f"디스코드 웹훅 전송 실패: {e}")
-        return None
+    if old_msg_id and UPDATE_MODE == "edit":
+        return discord_queue.enqueue_edit(WEBHOOK_URL, old_msg_id, [embed])
+    return discord_queue.enqueue(WEBHOOK_URL, [embed], wait=True)
+
+def pick_reverify(all_games, old_records):
+    """표가 바뀌지 않은 게임 중 상세 정보를 가장 오래 확인하지 않은 것부터 REVERIFY_PER_RUN 개"""
+    unchanged = [name for name, data in all_games.items()
+                 if old_records.get(name) and old_records[name].get('row_fp') == data['row_fp']]
+    unchanged.sort(key=lambda name: old_records[name].get('verified_at', 0))
+    return set(unchanged[:REVERIFY_PER_RUN])
 
 def run():
     print("옵티스케일러 봇 [전체 데이터 실전 모드] 시작 중...")
-    history = load_history()
-    all_games = parse_main_table()
+    mirror_pages = load_mirror()
+    if mirror_pages is not None and "compatibility-list" in mirror_pages:
+        all_games = parse_main_table(wiki_mirror.iter_lines(mirror_pages["compatibility-list"][0]))
+    else:
+        all_games = parse_main_table()
     
     if not all_games:
         print("게임을 불러오지 못했습니다.")
         return
         
+    old_records = {name: state_store.get(HISTORY_NS, name) for name in all_games}
+    # 미러에 있는 페이지는 blob 해시가 바뀐 것만 다시 읽고,
+    # 미러에 없는 페이지(미러를 못 쓰면 전부)는 오래 확인하지 않은 순서로 조금씩 다시 확인합니다.
+    blob_changed = {name for name, data in all_games.items() if page_changed(data['detail_link'], mirror_pages)}
+    unmirrored = {name: data for name, data in all_games.items()
+                  if data['detail_link'] and not mirror_key(data['detail_link'], mirror_pages)}
+    reverify = pick_reverify(unmirrored, old_records)
+    now = int(time.time())
     msg_count = 0
+    alerts = []   # (이름, 데이터, 기존 기록, 업데이트 여부)
+    pending = []  # (이름, 데이터, 메시지 ID Future)
+
+    # 1) 상세 정보가 필요한 게임을 고르고, 한꺼번에 받아와 파싱한 뒤 표 순서대로 붙입니다.
+    detail_names = [name for name, data in all_games.items()
+                    if old_records[name] is None or old_records[name].get('row_fp') != data['row_fp']
+                    or name in blob_changed or name in reverify]
+    started = time.time()
+    detail_results = dict(zip(detail_names, load_details_bulk([all_games[n]['detail_link'] for n in detail_names], mirror_pages)))
+    print(f"상세 정보 확인: {len(detail_names)}/{len(all_games)}건 ({time.time() - started:.1f}초)")
     
+    # 2) 기존 기록과 비교해서 신규/업데이트를 알립니다.
     for name, data in all_games.items():
-        old_data = history.get(name)
+        old_data = old_records[name]
         is_new = old_data is None
         
         main_changed = False
         if not is_new:
             # 🌟 anti_cheat 비교 로직도 optipatcher로 교체 완료
-            if (data['status'] != old_data.get('status', '') or
-                data['native_api'] != old_data.get('native_api', '') or
-                data['optipatcher'] != old_data.get('optipatcher', '') or
-                data.get('table_image', '') != old_data.get('table_image', '')):
-                main_changed = True
+            main_changed = any(data[f] != old_data.get(f, '') for f in ROW_FIELDS)
 
-        details = fetch_detail_page(data['detail_link'])
-        
-        if details.get('success'):
-            data['image'] = details.get('image', '')
-            data['notes'] = details.get('notes', '')
-            data['dll'] = details.get('dll', '')
-            data['upscaler_input'] = details.get('upscaler_input', '')
-            data['fg_input'] = details.get('fg_input', '')
-        else:
-            if not is_new:
-                data['image'] = old_data.get('image', '')
-                data['notes'] = old_data.get('notes', '')
-                data['dll'] = old_data.get('dll', '')
-                data['upscaler_input'] = old_data.get('upscaler_input', '')
-                data['fg_input'] = old_data.get('fg_input', '')
+        if name in detail_results:
+            details = detail_results[name]
+            # verified_at 은 미러 밖 페이지를 돌아가며 확인하는 순서에만 쓰므로, blob 변경으로 다시 읽은 행은 그대로 둡니다.
+            if is_new or name not in blob_changed:
+                data['verified_at'] = now
+            else:
+                data['verified_at'] = old_data.get('verified_at', 0)
+            
+            if details.get('success'):
+                for f in DETAIL_FIELDS:
+                    data[f] = details.get(f, '')
+            elif not is_new:
+                for f in DETAIL_FIELDS:
+                    data[f] = old_data.get(f, '')
             else:
-                data['image'] = ""
+                for f in DETAIL_FIELDS:
+                    data[f] = ""
                 data['notes'] = details.get('error_msg', '')
-                data['dll'] = ""
-                data['upscaler_input'] = ""
-                data['fg_input'] = ""
-                
-        time.sleep(0.5) 
+        else:
+            # 표 행이 그대로면 저장된 상세 정보를 그대로 씁니다.
+            for f in DETAIL_FIELDS:
+                data[f] = old_data.get(f, '')
+            data['verified_at'] = old_data.get('verified_at', 0)
+        data['detail_fp'] = fingerprint(*(data[f] for f in DETAIL_FIELDS))
         
         if is_new:
             data['kor_name'] = get_steam_korean_name(name)
@@ -369,32 +470,38 @@ def run():
             
         is_updated = False
         if not is_new:
+            # 지문이 없는 기록은 렌더링된 HTML 로 파싱하던 때 저장된 것입니다.
+            # 파서가 바뀌어서 생긴 상세 정보 차이는 알리지 않고 새 값으로 조용히 바꿔 둡니다.
+            old_detail_fp = old_data.get('detail_fp') or data['detail_fp']
             if (main_changed or
-                data['notes'] != old_data.get('notes', '') or
-                data['dll'] != old_data.get('dll', '') or
-                data['upscaler_input'] != old_data.get('upscaler_input', '') or
-                data['fg_input'] != old_data.get('fg_input', '') or
+                data['detail_fp'] != old_detail_fp or
                 data.get('kor_name', '') != old_data.get('kor_name', '')):
                 is_updated = True
                 
         if is_new or is_updated:
             print(f"알림 전송 중: {name} (신규: {is_new}, 업데이트: {is_updated})")
-            
-            new_msg_id = send_discord_alert(data, old_game=old_data, is_update=is_updated)
-            
-            if new_msg_id: 
-                data['message_id'] = new_msg_id
-            
-            history[name] = data
+            alerts.append((name, data, old_data, is_updated))
+            state_store.upsert(HISTORY_NS, name, data)
             msg_count += 1
-            
-            save_history(history)
-            time.sleep(3) 
-        else:
-            history[name] = data
+        elif data != old_data:
+            state_store.upsert(HISTORY_NS, name, data, commit=False)
+
+    # 3) 알림에 넣을 메모를 한꺼번에 번역해서 보냅니다.
+    ko_notes = translate_ko([data.get('notes', '') for _, data, _, _ in alerts])
+    for (name, data, old_data, is_updated), notes in zip(alerts, ko_notes):
+        future = send_discord_alert(data, old_game=old_data, is_update=is_updated, ko_notes=notes)
+        pending.append((name, data, future))
+
+    discord_queue.flush()
+    for name, data, future in pending:
+        new_msg_id = future.result()
+        if new_msg_id:
+            data['message_id'] = new_msg_id
+            state_store.upsert(HISTORY_NS, name, data, commit=False)
 
-    save_history(history)
+    prune_pages(mirror_pages)
+    state_store.commit()
     print(f"작업 완료! 총 {msg_count}건의 알림이 전송 및 업데이트되었습니다.")
 
 if __name__ == "__main__":
-    run()
\ No newline at end of file
+    run()
@@ -0,0 +1,396 @@
+import re
+import html
+from bs4 import BeautifulSoup
+
+# OptiScaler 위키 상세 페이지 파서입니다. (optiscaler_bot 이 씁니다)
+# 프로세스 풀에서 불러도 웹훅 설정 없이 import 되도록 봇 스크립트와 분리해 두었습니다.
+
+def empty_details():
+    return {"success": True, "image": "", "notes": "", "dll": "", "upscaler_input": "", "fg_input": ""}
+
+def _details_result(notes_lines, extracted_dll, upscaler_input, fg_input):
+    clean_text = "\n".join(notes_lines).strip()
+    if len(clean_text) > 400:
+        clean_text = clean_text[:400] + "...\n(상세 페이지 참조)"
+        
+    return {
+        "success": True,
+        "image": "", 
+        "notes": clean_text, 
+        "dll": extracted_dll,
+        "upscaler_input": upscaler_input,
+        "fg_input": fg_input
+    }
+
+def _apply_table_row(key, val, found):
+    if 'filename' in key: found['dll'] = val
+    elif 'upscaler input' in key: found['upscaler_input'] = val
+    elif 'fg input' in key: found['fg_input'] = val
+
+def _collect_notes(children, notes_lines):
+    """최상위 요소 중 문단(p)과 글머리표 목록(ul)의 글자를 메모 줄로 모읍니다."""
+    for child in children:
+        if child.name == 'p':
+            text = child.get_text(separator=" ", strip=True)
+            if text: notes_lines.append(text)
+        elif child.name == 'ul':
+            for li in child.find_all('li', recursive=False):
+                text = li.get_text(separator=" ", strip=True)
+                if text: notes_lines.append(f"- {text}")
+
+def parse_detail_html(page_html):
+    """렌더링된 깃허브 위키 페이지(HTML)에서 상세 정보를 뽑습니다."""
+    soup = BeautifulSoup(page_html, 'html.parser')
+    body = soup.find('div', class_='markdown-body')
+    
+    found = {"dll": "", "upscaler_input": "", "fg_input": ""}
+    notes_lines = []
+    
+    if body:
+        for table in body.find_all('table'):
+            for row in table.find_all('tr'):
+                cols = row.find_all(['th', 'td'])
+                if len(cols) >= 2:
+                    key = cols[0].get_text(strip=True).lower()
+                    val = cols[1].get_text(separator=" ", strip=True)
+                    _apply_table_row(key, val, found)
+                        
+        _collect_notes(body.children, notes_lines)
+                    
+    return _details_result(notes_lines, found['dll'], found['upscaler_input'], found['fg_input'])
+
+# 마크다운 인라인 문법: 이미지는 글자가 없으므로 버리고, 링크·코드·자동 링크는 안쪽 글자만 남기며,
+# 강조 기호와 HTML 태그는 BeautifulSoup 의 get_text(separator=" ") 처럼 글자 조각의 경계로만 씁니다.
+MD_IMAGE = re.compile(r'!\[[^\]]*\](?:\((?:[^()]|\([^()]*\))*\)|\[[^\]]*\])')
+MD_INLINE = re.compile(
+    r'\\(?P<esc>[!-/:-@\[-`{-~])'
+    r'|(?P<ticks>`+)(?P<code>.+?)(?<!`)(?P=ticks)(?!`)'
+    r'|\[(?P<link>[^\]]*)\](?:\((?:[^()]|\([^()]*\))*\)|\[[^\]]*\])'
+    r'|<(?P<auto>[a-zA-Z][a-zA-Z0-9+.-]{1,31}:[^\s<>]*|[\w.+-]+@[\w-]+(?:\.[\w-]+)+)>'
+    r'|<[^>]+>|\*\*|__|~~'
+    r'|(?<![\w*])\*+(?=\S)|(?<=\S)\*+(?![\w*])|(?<![\w_])_+(?=\S)|(?<=\S)_+(?![\w_])',
+    re.S
+)
+
+# 마크다운 블록 문법: 메모 추출에 필요한 만큼 CommonMark/GFM 규칙을 따릅니다.
+MD_FENCE = re.compile(r'^ {0,3}(`{3,}|~{3,})')
+MD_LIST_ITEM = re.compile(r'^( {0,3})([-*+]|\d{1,9}[.)])( +|$)(.*)$')
+MD_HEADING = re.compile(r'^ {0,3}#{1,6}(\s|$)')
+MD_SETEXT = re.compile(r'^ {0,3}(=+|-+)\s*$')
+MD_RULE = re.compile(r'^ {0,3}([-*_])(\s*\1){2,}\s*$')
+MD_QUOTE = re.compile(r'^ {0,3}>')
+MD_LINK_DEF = re.compile(r'^ {0,3}\[[^\]]+\]:\s*\S')
+MD_TABLE_SEPARATOR = re.compile(r'^\|?\s*:?-+:?\s*(\|\s*:?-+:?\s*)*\|?\s*$')
+MD_HARD_BREAK = re.compile(r'(  +|\\)$')
+
+# HTML 블록 (CommonMark 의 7가지 시작 조건). 1~5번은 끝 문자열이 나오는 줄에서, 6·7번은 빈 줄에서 끝납니다.
+HTML_BLOCK_TAGS = frozenset(
+    "address article aside base basefont blockquote body caption center col colgroup dd details dialog "
+    "dir div dl dt fieldset figcaption figure footer form frame frameset h1 h2 h3 h4 h5 h6 head header hr "
+    "html iframe legend li link main menu menuitem nav noframes ol optgroup option p param search section "
+    "summary table tbody td tfoot th thead title tr track ul".split()
+)
+HTML_VOID_TAGS = frozenset("area base br col embed hr img input link meta param source track wbr".split())
+HTML_RAW_START = re.compile(r'^ {0,3}<(script|pre|style|textarea)(\s|>|$)', re.I)
+HTML_BLOCK_START = re.compile(r'^ {0,3}</?([a-zA-Z][a-zA-Z0-9-]*)(\s|/?>|$)')
+HTML_LINE_TAG = re.compile(
+    r'^ {0,3}(?:<[a-zA-Z][a-zA-Z0-9-]*'
+    r'(?:\s+[a-zA-Z_:][\w.:-]*(?:\s*=\s*(?:[^\s"\'=<>`]+|\'[^\']*\'|"[^"]*"))?)*\s*/?>'
+    r'|</[a-zA-Z][a-zA-Z0-9-]*\s*>)\s*$'
+)
+HTML_TAG = re.compile(r'<(/?)([a-zA-Z][a-zA-Z0-9-]*)(?:[^>"\']|"[^"]*"|\'[^\']*\')*?(/?)>')
+
+def _md_inline(text):
+    """인라인 문법을 풀어 글자 조각 경계를 \\0 으로 표시합니다. (링크 글자는 다시 풀어 씁니다)"""
+    pieces = []
+    pos = 0
+    for match in MD_INLINE.finditer(text):
+        pieces.append(html.unescape(text[pos:match.start()]))
+        if match.group('esc') is not None:
+            pieces.append(match.group('esc'))
+        elif match.group('code') is not None:
+            pieces.append("\0" + match.group('code') + "\0")
+        elif match.group('link') is not None:
+            pieces.append("\0" + _md_inline(match.group('link')) + "\0")
+        elif match.group('auto') is not None:
+            pieces.append("\0" + match.group('auto') + "\0")
+        else:
+            pieces.append("\0")
+        pos = match.end()
+    pieces.append(html.unescape(text[pos:]))
+    return "".join(pieces)
+
+def _md_text(text, separator=" "):
+    """마크다운 한 덩어리를 렌더링된 HTML 의 get_text(separator, strip=True) 와 같은 글자로 바꿉니다."""
+    parts = [p.strip() for p in _md_inline(MD_IMAGE.sub("\0", text)).split("\0")]
+    return separator.join(p for p in parts if p)
+
+def _md_lines(lines):
+    """문단 줄들을 잇습니다. 줄 끝의 공백 두 칸이나 역슬래시(강제 줄바꿈)는 <br> 처럼 글자 조각을 나눕니다."""
+    out = []
+    for i, line in enumerate(lines):
+        text = line.strip()
+        if i < len(lines) - 1 and MD_HARD_BREAK.search(line):
+            text = (text[:-1] if text.endswith('\\') else text) + "<br>"
+        out.append(text)
+    return _md_text("\n".join(out))
+
+def _md_cells(line):
+    line = line.strip()
+    if line.startswith('|'): line = line[1:]
+    if line.endswith('|'): line = line[:-1]
+    return [c.strip() for c in re.split(r'(?<!\\)\|', line)]
+
+def _table_width(line, next_line):
+    """line 이 표의 머리 줄이면(다음 줄이 같은 칸 수의 구분선) 칸 수, 아니면 0"""
+    if '|' not in line or '|' not in next_line or not MD_TABLE_SEPARATOR.match(next_line.strip()):
+        return 0
+    width = len(_md_cells(line))
+    return width if width == len(_md_cells(next_line)) else 0
+
+def _list_item(line):
+    """목록 항목 줄이면 (종류, 내용이 시작하는 열, 첫 줄 글자), 아니면 None"""
+    match = MD_LIST_ITEM.match(line)
+    if not match:
+        return None
+    marker_end = len(match.group(1)) + len(match.group(2))
+    spaces = len(match.group(3))
+    if spaces > 4 or not match.group(4):
+        spaces = 1
+    kind = "bullet" if match.group(2) in "-*+" else "ordered"
+    return kind, marker_end + spaces, match.group(4)
+
+def _html_block_end(line, in_paragraph):
+    """HTML 블록을 시작하는 줄이면 끝 조건(끝 문자열, 빈 줄에서 끝나면 ""), 아니면 None"""
+    stripped = line.lstrip(' ')
+    raw = HTML_RAW_START.match(line)
+    if raw: return f"</{raw.group(1).lower()}>"
+    if stripped.startswith('<!--'): return "-->"
+    if stripped.startswith('<?'): return "?>"
+    if stripped.startswith('<![CDATA['): return "]]>"
+    if re.match(r'<![a-zA-Z]', stripped): return ">"
+    tag = HTML_BLOCK_START.match(line)
+    if tag and tag.group(1).lower() in HTML_BLOCK_TAGS: return ""
+    if not in_paragraph and HTML_LINE_TAG.match(line): return ""
+    return None
+
+def _html_depth(text, depth):
+    """HTML 조각을 지난 뒤 아직 닫히지 않은 태그 수"""
+    for match in HTML_TAG.finditer(text):
+        if match.group(3) or match.group(2).lower() in HTML_VOID_TAGS:
+            continue
+        depth = depth - 1 if match.group(1) else depth + 1
+    return max(depth, 0)
+
+def _interrupts(line):
+    """문단(또는 목록 항목의 이어지는 줄)을 끊고 새 블록을 시작하는 줄인지"""
+    item = _list_item(line)
+    if item and item[2] and (item[0] == "bullet" or re.match(r' {0,3}1[.)]', line)):
+        return True
+    return bool(MD_FENCE.match(line) or MD_HEADING.match(line) or MD_QUOTE.match(line)
+                or MD_RULE.match(line) or _html_block_end(line, True) is not None)
+
+def parse_detail_markdown(md):
+    """위키 원문(.md)에서 parse_detail_html 과 같은 상세 정보를 뽑습니다. 문서 전체의 DOM 을 만들지 않습니다."""
+    found = {"dll": "", "upscaler_input": "", "fg_input": ""}
+    if '<table' in md.lower():
+        # 마크다운 안에 HTML 표를 직접 쓴 페이지는 표 부분만 HTML 파서로 읽습니다.
+        for row in BeautifulSoup(md, 'html.parser').find_all('tr'):
+            cols = row.find_all(['th', 'td'])
+            if len(cols) >= 2:
+                _apply_table_row(cols[0].get_text(strip=True).lower(), cols[1].get_text(separator=" ", strip=True), found)
+
+    lines = [line.rstrip('\n').expandtabs(4) for line in md.splitlines()]
+    notes_lines = []
+    paragraph = []
+    container = None   # 열려 있는 목록/인용문 {"kind", "indent", "chunks", "blank"}
+    fence = None       # 열려 있는 코드 블록 (울타리 문자열, 목록 항목 안인지)
+    html_block = None  # 모으는 중인 HTML 블록 (끝 조건, 줄 목록)
+    html_depth = 0     # 원문 HTML 로 열고 아직 닫지 않은 태그 수 (그 안의 문단은 최상위 요소가 아닙니다)
+
+    def flush_paragraph():
+        if paragraph:
+            text = _md_lines(paragraph)
+            if text and not html_depth: notes_lines.append(text)
+            paragraph.clear()
+
+    def close_container():
+        nonlocal container
+        if container and container['kind'] == "bullet" and not html_depth:
+            # 항목 안의 문단·하위 목록·코드는 각각 별도 요소라서 공백 하나로 구분됩니다.
+            parts = [chunk[1] if chunk[0] else _md_lines(chunk[1]) for chunk in container['chunks']]
+            text = " ".join(p.strip() for p in parts if p.strip())
+            if text: notes_lines.append(f"- {text}")
+        container = None
+
+    def end_html_block():
+        nonlocal html_block, html_depth
+        text = "\n".join(html_block[1])
+        if not html_depth:
+            _collect_notes(BeautifulSoup(text, 'html.parser').children, notes_lines)
+        html_depth = _html_depth(text, html_depth)
+        html_block = None
+
+    def open_item(item):
+        nonlocal container
+        kind, indent, text = item
+        container = {"kind": kind, "indent": indent, "chunks": [[False, [text]]], "blank": False}
+
+    def add_to_item(sub):
+        """목록 항목 안쪽 줄 (항목 들여쓰기를 뺀 줄)"""
+        nonlocal fence
+        chunks = container['chunks']
+        nested = _list_item(sub.lstrip(' ')) if sub.strip() else None
+        fence_match = MD_FENCE.match(sub)
+        if fence_match:
+            fence = (fence_match.group(1), True)
+            chunks.append([True, ""])
+        elif nested:
+            chunks.append([False, [nested[2]]])
+        elif MD_HEADING.match(sub):
+            chunks.append([True, _md_text(sub.strip().strip('#'))])
+        elif MD_QUOTE.match(sub):
+            chunks.append([False, [sub.lstrip(' ')[1:]]])
+        elif container['blank'] or chunks[-1][0]:
+            chunks.append([False, [sub]])
+        else:
+            chunks[-1][1].append(sub)
+        container['blank'] = False
+
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+        i += 1
+
+        if fence is not None:
+            marker, in_item = fence
+            body = line[container['indent']:] if in_item and container else line
+            if re.match(rf'^ {{0,3}}{re.escape(marker[0])}{{{len(marker)},}}\s*$', body):
+                fence = None
+            elif in_item and container:
+                # 항목 안 코드 블록의 글자도 항목 글자에 들어갑니다.
+                chunk = container['chunks'][-1]
+                chunk[1] = f"{chunk[1]}\n{body}" if chunk[1] else body
+            continue
+
+        if html_block is not None:
+            end = html_block[0]
+            if end == "" and not line.strip():
+                end_html_block()
+                continue
+            html_block[1].append(line)
+            if end and end in line.lower():
+                end_html_block()
+            continue
+
+        if not line.strip():
+            flush_paragraph()
+            if container:
+                if container['kind'] == "quote":
+                    close_container()
+                else:
+                    container['blank'] = True
+            continue
+
+        indent = len(line) - len(line.lstrip(' '))
+
+        if container:
+            if container['kind'] != "quote" and indent >= container['indent']:
+                if container['kind'] == "bullet":
+                    add_to_item(line[container['indent']:])
+                continue
+            if container['kind'] == "quote" and MD_QUOTE.match(line):
+                continue
+            lazy = not container['blank'] and not _interrupts(line) and not _list_item(line)
+            if lazy and container['kind'] == "bullet" and not container['chunks'][-1][0]:
+                # 게으른 이어쓰기: 빈 줄 없이 들여쓰지 않고 이어지는 줄도 항목의 마지막 문단에 붙습니다.
+                container['chunks'][-1][1].append(line)
+                continue
+            if lazy and container['kind'] != "bullet":
+                continue
+            item = _list_item(line)
+            if item and item[0] == container['kind'] != "quote":
+                close_container()
+                open_item(item)
+                continue
+            close_container()
+
+        table_width = _table_width(line, lines[i] if i < len(lines) else "")
+        if paragraph and not table_width and (indent >= 4 or not (_interrupts(line) or MD_SETEXT.match(line))):
+            paragraph.append(line)  # 문단이 이어지는 줄
+            continue
+
+        if indent >= 4:
+            continue  # 들여쓴 코드 블록
+
+        fence_match = MD_FENCE.match(line)
+        if fence_match:
+            flush_paragraph()
+            fence = (fence_match.group(1), False)
+            continue
+
+        if paragraph and MD_SETEXT.match(line):
+            paragraph.clear()  # 바로 앞 문단은 (=== / ---) 밑줄 제목입니다.
+            continue
+
+        end = _html_block_end(line, bool(paragraph))
+        if end is not None:
+            flush_paragraph()
+            html_block = (end, [line])
+            if end and end in line.lower().lstrip(' ')[2:]:
+                end_html_block()  # 시작한 줄에서 바로 끝나는 블록
+            continue
+
+        if MD_HEADING.match(line) or MD_RULE.match(line):
+            # 제목과 구분선은 메모에 들어가지 않습니다.
+            flush_paragraph()
+            continue
+
+        if MD_QUOTE.match(line):
+            flush_paragraph()
+            container = {"kind": "quote", "blank": False}
+            continue
+
+        if table_width:
+            flush_paragraph()
+            rows = [line]
+            i += 1  # 구분선
+            while i < len(lines) and lines[i].strip() and not _interrupts(lines[i]):
+                rows.append(lines[i])
+                i += 1
+            for row in rows:
+                # 칸 수는 머리 줄에 맞춰지고, 모자란 칸은 빈 칸으로 채워집니다.
+                cols = (_md_cells(row) + [""] * table_width)[:table_width]
+                if table_width >= 2:
+                    _apply_table_row(_md_text(cols[0], separator="").lower(), _md_text(cols[1]), found)
+            continue
+
+        item = _list_item(line)
+        if item:
+            flush_paragraph()
+            open_item(item)
+            continue
+
+        if not paragraph and MD_LINK_DEF.match(line):
+            continue  # 링크 참조 정의는 화면에 보이지 않습니다.
+
+        paragraph.append(line)
+
+    if html_block is not None:
+        end_html_block()
+    flush_paragraph(); close_container()
+    return _details_result(notes_lines, found['dll'], found['upscaler_input'], found['fg_input'])
+
+def parse_source(kind, content):
+    """
+    받아 온 원문을 종류에 맞게 파싱합니다. (프로세스 풀에서 실행되는 최상위 함수)
+    kind: "md" = 위키 원문, "html" = 렌더링된 페이지, "details" = 이미 만들어진 결과
+    """
+    if kind == "details":
+        return content
+    try:
+        if kind == "md":
+            return parse_detail_markdown(content)
+        return parse_detail_html(content)
+    except Exception as e:
+        return {"success": False, "error_msg": f"⚠️ 파싱 에러 발생: {e}"}
@@ -0,0 +1,75 @@
+import os
+import time
+import state_store
+
+# ================= 설정 =================
+# 게임별 호환성 재확인 스케줄러입니다.
+# 마지막 확인 시각과 '변경 확률' 점수를 저장해 두고, 자주 바뀌는 게임·새로 추적한 게임은 자주,
+# 오래 그대로인 게임과 Unknown 게임은 점점 드물게(지수 백오프) 확인합니다.
+# '새 게임'은 출시일이 아니라 봇이 처음 추적한 시각(first_seen) 기준입니다. 검색 결과의 출시일 표기는
+# 언어·형식이 제각각이라 믿기 어렵고, 새로 출시된 게임은 대부분 목록에 새로 들어오면서 처음 추적되기 때문입니다.
+SCHEDULE_NS = "compat_schedule"
+
+MIN_INTERVAL = 3600                 # 가장 짧은 재확인 간격 (1시간)
+MAX_INTERVAL = 14 * 24 * 3600       # 안정된 게임의 최대 재확인 간격 (14일)
+UNKNOWN_MAX_INTERVAL = 7 * 24 * 3600  # Unknown 결과의 최대 재확인 간격 (7일)
+VOLATILE_MAX_INTERVAL = 6 * 3600    # 자주 바뀌는/새로 추적한 게임의 최대 간격
+NEW_TITLE_WINDOW = 30 * 24 * 3600   # 처음 추적한 뒤(출시일 아님) 이 기간 동안은 '새 게임'으로 취급
+VOLATILE_SCORE = 0.3                # 변경 확률 점수가 이 이상이면 '자주 바뀌는 게임'
+SCORE_DECAY = 0.7                   # 점수 = 이전 점수 * DECAY + (이번에 바뀌었으면 1 - DECAY)
+RUN_BUDGET = int(os.environ.get('RECHECK_BUDGET', 300))  # 1회 실행당 최대 호환성 조회 수
+# =======================================
+
+def _priority(entry, now):
+    """마감을 얼마나 넘겼는지(비율)에 변경 확률을 곱한 값 - 클수록 먼저 확인합니다."""
+    overdue = (now - entry['last_check']) / max(entry['interval'], 1)
+    return overdue * (1 + entry.get('score', 0.0))
+
+def select_due(appids, budget=RUN_BUDGET, force=(), now=None):
+    """
+    이번 실행에서 확인할 appid 집합을 돌려줍니다.
+    스케줄 기록이 없는 게임과 force 에 든 게임은 예산과 관계없이 항상 뽑고,
+    나머지는 마감된 것 중 우선순위 순으로 남은 예산만큼 채웁니다.
+    """
+    now = now or time.time()
+    force = set(force)
+    must = []
+    due = []
+    for appid in appids:
+        entry = state_store.get(SCHEDULE_NS, appid)
+        if entry is None or appid in force:
+            must.append(appid)
+        elif now - entry['last_check'] >= entry['interval']:
+            due.append((_priority(entry, now), appid))
+
+    due.sort(reverse=True)
+    selected = must + [appid for _, appid in due[:max(0, budget - len(must))]]
+    print(f"🗓️ 재확인 대상: {len(selected)}/{len(appids)} (필수 {len(must)}, 마감 {len(due)}, 예산 {budget})")
+    return set(selected)
+
+def record(appid, status, changed, now=None):
+    """확인 결과를 반영해 다음 재확인 간격을 정합니다. (조회에 실패한 게임은 부르지 마세요)"""
+    now = now or time.time()
+    entry = state_store.get(SCHEDULE_NS, appid) or {"first_seen": now, "interval": MIN_INTERVAL, "score": 1.0}
+
+    score = entry.get('score', 0.0) * SCORE_DECAY + ((1 - SCORE_DECAY) if changed else 0.0)
+    is_unknown = status.get('deck') == "Unknown" and status.get('machine') == "Unknown"
+    is_new = now - entry.get('first_seen', now) < NEW_TITLE_WINDOW
+
+    if changed:
+        interval = MIN_INTERVAL
+    else:
+        interval = entry.get('interval', MIN_INTERVAL) * 2
+        if is_unknown:
+            interval = min(interval, UNKNOWN_MAX_INTERVAL)
+        elif score >= VOLATILE_SCORE or is_new:
+            interval = min(interval, VOLATILE_MAX_INTERVAL)
+        else:
+            interval = min(interval, MAX_INTERVAL)
+
+    state_store.upsert(SCHEDULE_NS, appid, {
+        "first_seen": entry.get('first_seen', now),
+        "last_check": now,
+        "interval": interval,
+        "score": round(score, 4)
+    }, commit=False)
@@ -0,0 +1,208 @@
+import os
+import re
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from bs4 import BeautifulSoup, SoupStrainer
+import http_cache
+
+# ================= 설정 =================
+# 스팀 상점 검색 결과(#search_resultsRows)의 각 줄을 뽑아내는 공용 파서입니다.
+# 페이지 전체 DOM 을 만들지 않고 결과 줄(a.search_result_row)만 파싱합니다.
+try:
+    import lxml  # noqa: F401
+    PARSER = "lxml"
+except ImportError:
+    PARSER = "html.parser"
+
+# infinite 스크롤용 JSON 검색 결과 (start/count 로 페이지 이동)
+SEARCH_RESULTS_URL = "https://store.steampowered.com/search/results/"
+RESULTS_PAGE_SIZE = 100
+PAGE_WORKERS = 4  # 동시에 가져올 페이지 수 (호스트 속도 제한은 http_client 가 지킵니다)
+
+ROW_STRAINER = SoupStrainer("a", attrs={"data-ds-appid": True})
+REVIEW_COUNT_RE = re.compile(r'([0-9,]+)개')
+
+# 벤치마크(python search_rows.py)용 검색 페이지. 파일이 없으면 처음 실행할 때 받아서 저장합니다.
+BENCH_DIR = ".search_bench"
+BENCH_PAGES = {
+    "reviews.html": "https://store.steampowered.com/search/?sort_by=Reviews_DESC&category1=998&l=koreana&cc=kr",
+    "released.html": "https://store.steampowered.com/search/?sort_by=Released_DESC&category1=998&l=koreana&cc=kr",
+    "topsellers_verified.html": "https://store.steampowered.com/search/?filter=topsellers&category1=998&deck_compatibility=3&l=koreana&cc=kr",
+}
+# =======================================
+
+def header_image(appid):
+    return f"https://cdn.cloudflare.steamstatic.com/steam/apps/{appid}/header.jpg"
+
+def normalize_price(price_text):
+    """'Free' / '무료 플레이' 같은 표기를 '무료'로 통일합니다."""
+    if "Free" in price_text or "무료" in price_text:
+        return "무료"
+    return price_text
+
+def _text(row, class_name):
+    el = row.find(class_=class_name)
+    return el.get_text().strip() if el else ""
+
+def parse_row(row):
+    """결과 한 줄(a 태그)을 간단한 딕셔너리로 바꿉니다. appid/제목이 없으면 None"""
+    raw_appid = row.get('data-ds-appid')
+    if not raw_appid:
+        return None
+    # 번들 등으로 ID가 여러 개일 경우 첫 번째만 사용
+    appid = raw_appid.split(',')[0]
+
+    title_el = row.find(class_="title")
+    if title_el is None:
+        return None
+
+    img_url = ""
+    capsule = row.find(class_="search_capsule")
+    img_tag = capsule.find("img") if capsule else None
+    if img_tag:
+        img_url = img_tag.get('src')
+        srcset = img_tag.get('srcset')
+        if srcset:
+            # 고해상도 이미지 우선
+            img_url = srcset.split(',')[0].split(' ')[0]
+    if not img_url:
+        img_url = header_image(appid)
+
+    review_count = 0
+    review_sentiment = "평가 없음"
+    review_summary = row.find(class_="search_review_summary")
+    if review_summary:
+        raw_tooltip = review_summary.get('data-tooltip-html', '')
+        parts = raw_tooltip.split('<br>')
+        if parts: review_sentiment = parts[0].strip()
+        match = REVIEW_COUNT_RE.search(raw_tooltip)
+        if match: review_count = int(match.group(1).replace(',', ''))
+
+    price_text = _text(row, "discount_final_price") or _text(row, "search_price") or "가격 정보 없음"
+
+    return {
+        "id": str(appid),
+        "title": title_el.get_text().strip(),
+        "link": row.get('href', ''),
+        "img": img_url,
+        "price": price_text,
+        "sentiment": review_sentiment,
+        "reviews": review_count,
+        "released": _text(row, "search_released")
+    }
+
+def extract_rows(html):
+    """검색 페이지 HTML(또는 infinite 스크롤 JSON 의 results_html)에서 결과 줄 목록을 뽑습니다."""
+    soup = BeautifulSoup(html, PARSER, parse_only=ROW_STRAINER)
+    rows = []
+    for row in soup.find_all("a", class_="search_result_row"):
+        try:
+            record = parse_row(row)
+        except Exception:
+            continue
+        if record:
+            rows.append(record)
+    return rows
+
+def fetch_results_page(query, start, count=RESULTS_PAGE_SIZE):
+    """JSON 검색 결과 한 페이지를 가져옵니다. 실패하면 None"""
+    params = dict(query)
+    params.update({"start": start, "count": count, "infinite": 1, "json": 1})
+    try:
+        res = http_cache.get(SEARCH_RESULTS_URL, params=params, timeout=10)
+        if res.status_code != 200:
+            print(f"검색 결과 요청 실패 (start={start}): HTTP {res.status_code}")
+            return None
+        data = res.json()
+        if data.get('success') != 1:
+            return None
+        return extract_rows(data.get('results_html', ''))
+    except Exception as e:
+        print(f"검색 결과 파싱 에러 (start={start}): {e}")
+        return None
+
+def iter_result_pages(query, max_results, workers=PAGE_WORKERS, stop=None):
+    """
+    max_results 개까지 검색 결과 페이지를 workers 개씩 동시에 가져와 순서대로 돌려줍니다.
+    빈 페이지를 만나거나 stop(rows) 가 True 를 돌려주면 그 페이지까지만 내보내고 멈춥니다.
+    """
+    starts = list(range(0, max_results, RESULTS_PAGE_SIZE))
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        for i in range(0, len(starts), workers):
+            wave = starts[i:i + workers]
+            counts = [min(RESULTS_PAGE_SIZE, max_results - s) for s in wave]
+            for rows in executor.map(lambda sc: fetch_results_page(query, sc[0], sc[1]), zip(wave, counts)):
+                if not rows:
+                    return
+                yield rows
+                if stop and stop(rows):
+                    return
+
+def _legacy_extract(html):
+    """비교용: 기존 방식(전체 DOM + select_one)"""
+    soup = BeautifulSoup(html, "html.parser")
+    rows = []
+    for row in soup.select("#search_resultsRows > a"):
+        try:
+            raw_appid = row.get('data-ds-appid')
+            if not raw_appid: continue
+            appid = raw_appid.split(',')[0]
+            title = row.select_one(".title").text.strip()
+            img_tag = row.select_one(".search_capsule img")
+            review_summary = row.select_one(".search_review_summary")
+            price_el = row.select_one(".discount_final_price") or row.select_one(".search_price")
+            rows.append((appid, title, img_tag, review_summary, price_el))
+        except Exception:
+            continue
+    return rows
+
+def bench_pages():
+    """BENCH_DIR 의 검색 페이지 경로 목록. 없는 페이지는 먼저 받아서 저장합니다."""
+    os.makedirs(BENCH_DIR, exist_ok=True)
+    paths = []
+    for name, url in BENCH_PAGES.items():
+        path = os.path.join(BENCH_DIR, name)
+        if not os.path.exists(path):
+            print(f"📥 벤치마크용 페이지 저장: {url}")
+            try:
+                res = http_cache.get(url, timeout=10)
+                res.raise_for_status()
+            except Exception as e:
+                print(f"⚠️ 페이지를 받지 못해서 건너뜁니다 ({name}): {e}")
+                continue
+            with open(path, "w", encoding='utf-8') as f:
+                f.write(res.text)
+        paths.append(path)
+    return paths
+
+if __name__ == "__main__":
+    # 마이크로 벤치마크: python search_rows.py [<저장한 검색 페이지.html> ...] [--repeat N]
+    # 파일을 주지 않으면 BENCH_PAGES 를 (처음 한 번 받아서) 씁니다.
+    args = sys.argv[1:]
+    repeat = 20
+    if "--repeat" in args:
+        i = args.index("--repeat")
+        repeat = int(args[i + 1])
+        del args[i:i + 2]
+    if not args:
+        args = bench_pages()
+    if not args:
+        print("사용법: python search_rows.py [<검색 페이지.html> ...] [--repeat N]")
+        sys.exit(1)
+
+    for path in args:
+        with open(path, "r", encoding='utf-8') as f:
+            html = f.read()
+
+        start = time.perf_counter()
+        for _ in range(repeat): legacy = _legacy_extract(html)
+        legacy_ms = (time.perf_counter() - start) / repeat * 1000
+
+        start = time.perf_counter()
+        for _ in range(repeat): fast = extract_rows(html)
+        fast_ms = (time.perf_counter() - start) / repeat * 1000
+
+        same_ids = [r[0] for r in legacy] == [r['id'] for r in fast]
+        print(f"{path}: 기존 {legacy_ms:.1f}ms / 신규({PARSER}) {fast_ms:.1f}ms "
+              f"→ {legacy_ms / fast_ms:.1f}배, 결과 {len(fast)}줄, 일치: {same_ids}")
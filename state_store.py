@@ -0,0 +1,226 @@
+import os
+import sys
+import json
+import time
+import atexit
+import sqlite3
+import threading
+
+# ================= 설정 =================
+# 모든 봇이 함께 쓰는 SQLite 상태 저장소입니다. (sent_*.json 파일 대체)
+# 워크플로마다 서로 다른 DB 파일을 쓰게 해서(STATE_DB), 동시에 돌아도 git push 충돌이 나지 않게 합니다.
+DB_PATH = os.environ.get('STATE_DB', 'state/state.db')
+
+# 네임스페이스별 기존 JSON 파일 (처음 접근할 때 한 번만 자동 이관)
+LEGACY_FILES = {
+    "games": "sent_games.json",
+    "sales": "sent_sales.json",
+    "new_releases": "sent_new_releases.json",
+    "videos": "sent_videos.json",
+    "steamos": "sent_steamos.json",
+    "optiscaler": "optiscaler_games.json",
+}
+ITEMS_PAGE_SIZE = 500  # items() 가 한 번에 읽어 오는 행 수
+# =======================================
+
+_conn = None
+_lock = threading.RLock()
+_checked_namespaces = set()
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS state (
+    ns TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT,
+    message_id TEXT,
+    is_legacy INTEGER NOT NULL DEFAULT 0,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (ns, key)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_state_updated ON state (ns, updated_at);
+CREATE INDEX IF NOT EXISTS idx_state_legacy ON state (ns, is_legacy) WHERE is_legacy = 1;
+CREATE TABLE IF NOT EXISTS migrations (
+    ns TEXT PRIMARY KEY,
+    migrated_at REAL NOT NULL
+);
+"""
+
+def open_db(path=None):
+    """DB 파일을 엽니다. 지정하지 않으면 STATE_DB 환경변수(또는 기본 경로)를 씁니다."""
+    global _conn, DB_PATH
+    with _lock:
+        if _conn is not None:
+            close()
+        if path:
+            DB_PATH = path
+        db_dir = os.path.dirname(DB_PATH)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        _conn = sqlite3.connect(DB_PATH, check_same_thread=False)
+        _conn.executescript(SCHEMA)
+        _conn.commit()
+        _checked_namespaces.clear()
+    return _conn
+
+def _db(ns):
+    with _lock:
+        if _conn is None:
+            open_db()
+        if ns not in _checked_namespaces:
+            _checked_namespaces.add(ns)
+            _migrate_if_needed(ns)
+    return _conn
+
+def close():
+    global _conn
+    with _lock:
+        if _conn is not None:
+            _conn.commit()
+            _conn.close()
+            _conn = None
+
+atexit.register(close)
+
+def _encode(value):
+    return None if value is None else json.dumps(value, ensure_ascii=False)
+
+def _decode(raw):
+    return None if raw is None else json.loads(raw)
+
+def is_seen(ns, key):
+    with _lock:
+        row = _db(ns).execute("SELECT 1 FROM state WHERE ns = ? AND key = ?", (ns, str(key))).fetchone()
+    return row is not None
+
+def get(ns, key, default=None):
+    with _lock:
+        row = _db(ns).execute("SELECT value FROM state WHERE ns = ? AND key = ?", (ns, str(key))).fetchone()
+    if row is None or row[0] is None:
+        return default
+    return _decode(row[0])
+
+def get_message_id(ns, key):
+    with _lock:
+        row = _db(ns).execute("SELECT message_id FROM state WHERE ns = ? AND key = ?", (ns, str(key))).fetchone()
+    return row[0] if row else None
+
+def upsert(ns, key, value=None, message_id=None, commit=True):
+    """항목을 저장합니다. value 가 dict 이고 message_id 가 들어 있으면 따로 색인해 둡니다."""
+    if message_id is None and isinstance(value, dict):
+        message_id = value.get('message_id')
+    with _lock:
+        conn = _db(ns)
+        conn.execute(
+            "INSERT INTO state (ns, key, value, message_id, is_legacy, updated_at) VALUES (?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT(ns, key) DO UPDATE SET value = excluded.value, "
+            "message_id = COALESCE(excluded.message_id, state.message_id), "
+            "is_legacy = excluded.is_legacy, updated_at = excluded.updated_at",
+            (ns, str(key), _encode(value), message_id, 1 if isinstance(value, str) else 0, time.time())
+        )
+        if commit:
+            conn.commit()
+
+def commit():
+    with _lock:
+        if _conn is not None:
+            _conn.commit()
+
+def mark_seen(ns, key):
+    upsert(ns, key)
+
+def delete(ns, key):
+    with _lock:
+        conn = _db(ns)
+        conn.execute("DELETE FROM state WHERE ns = ? AND key = ?", (ns, str(key)))
+        conn.commit()
+
+def items(ns, page_size=ITEMS_PAGE_SIZE):
+    """
+    (key, value) 를 오래된 순으로 하나씩 돌려줍니다. 전체를 메모리에 올리지 않고 page_size 개씩 (updated_at, key) 순서로 읽습니다.
+    도는 중에 같은 네임스페이스에 upsert 한 항목은 맨 뒤로 옮겨져 다시 나올 수 있습니다.
+    """
+    last = None
+    while True:
+        with _lock:
+            if last is None:
+                rows = _db(ns).execute(
+                    "SELECT key, value, updated_at FROM state WHERE ns = ? ORDER BY updated_at, key LIMIT ?",
+                    (ns, page_size)
+                ).fetchall()
+            else:
+                rows = _db(ns).execute(
+                    "SELECT key, value, updated_at FROM state WHERE ns = ? AND (updated_at > ? OR (updated_at = ? AND key > ?)) "
+                    "ORDER BY updated_at, key LIMIT ?",
+                    (ns, last[0], last[0], last[1], page_size)
+                ).fetchall()
+        for key, raw, _ in rows:
+            yield key, _decode(raw)
+        if len(rows) < page_size:
+            return
+        last = (rows[-1][2], rows[-1][0])
+
+def legacy_keys(ns):
+    """예전 형식(문자열 값)으로 남아 있는 항목의 key 목록"""
+    with _lock:
+        rows = _db(ns).execute("SELECT key FROM state WHERE ns = ? AND is_legacy = 1", (ns,)).fetchall()
+    return [r[0] for r in rows]
+
+def count(ns):
+    with _lock:
+        return _db(ns).execute("SELECT COUNT(*) FROM state WHERE ns = ?", (ns,)).fetchone()[0]
+
+def evict(ns, max_age=None, keep_latest=None):
+    """max_age(초)보다 오래된 항목, 또는 최신 keep_latest 개를 넘는 항목을 지웁니다."""
+    with _lock:
+        conn = _db(ns)
+        if max_age is not None:
+            conn.execute("DELETE FROM state WHERE ns = ? AND updated_at < ?", (ns, time.time() - max_age))
+        if keep_latest is not None:
+            conn.execute(
+                "DELETE FROM state WHERE ns = ? AND key NOT IN "
+                "(SELECT key FROM state WHERE ns = ? ORDER BY updated_at DESC LIMIT ?)",
+                (ns, ns, keep_latest)
+            )
+        conn.commit()
+
+def _migrate_if_needed(ns):
+    done = _conn.execute("SELECT 1 FROM migrations WHERE ns = ?", (ns,)).fetchone()
+    if done:
+        return
+    path = LEGACY_FILES.get(ns)
+    if path and os.path.exists(path):
+        migrate_json(ns, path)
+    _conn.execute("INSERT OR REPLACE INTO migrations (ns, migrated_at) VALUES (?, ?)", (ns, time.time()))
+    _conn.commit()
+
+def migrate_json(ns, path):
+    """기존 JSON 기록 파일을 네임스페이스로 옮깁니다. (리스트: 본 ID 목록 / 딕셔너리: 전체 레코드)"""
+    with open(path, "r", encoding='utf-8') as f:
+        try:
+            data = json.load(f)
+        except:
+            data = None
+
+    now = time.time()
+    rows = []
+    if isinstance(data, list):
+        # 리스트 순서(오래된 것 → 최신)를 updated_at 순서로 보존합니다.
+        for i, key in enumerate(data):
+            rows.append((ns, str(key), None, None, 0, now - len(data) + i))
+    elif isinstance(data, dict):
+        for key, value in data.items():
+            message_id = value.get('message_id') if isinstance(value, dict) else None
+            rows.append((ns, str(key), _encode(value), message_id, 1 if isinstance(value, str) else 0, now))
+
+    _conn.executemany(
+        "INSERT OR IGNORE INTO state (ns, key, value, message_id, is_legacy, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+        rows
+    )
+    _conn.commit()
+    print(f"📦 {path} → {DB_PATH} [{ns}] {len(rows)}건 이관 완료")
+    return len(rows)
+
+if __name__ == "__main__":
+    # 수동 이관: python state_store.py <네임스페이스> [<네임스페이스> ...]
+    for ns in sys.argv[1:] or LEGACY_FILES.keys():
+        _db(ns)
@@ -0,0 +1,32 @@
+import os
+import pytest
+import optiscaler_parse
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "optiscaler")
+
+def _read(name):
+    with open(os.path.join(FIXTURES, name), "r", encoding='utf-8') as f:
+        return f.read()
+
+# 같은 위키 페이지의 원문(.md)과 깃허브가 렌더링한 페이지(.html) 쌍
+PAGES = sorted(name[:-len(".md")] for name in os.listdir(FIXTURES) if name.endswith(".md"))
+
+@pytest.mark.parametrize("page", PAGES)
+def test_markdown_matches_rendered_html(page):
+    md = optiscaler_parse.parse_detail_markdown(_read(f"{page}.md"))
+    rendered = optiscaler_parse.parse_detail_html(_read(f"{page}.html"))
+    assert md == rendered
+
+def test_paragraph_after_list_is_not_glued_into_bullet():
+    md = "Intro para.\n\n- item one\n- item two\n\nClosing paragraph.\nAnother line of it."
+    rendered = (
+        '<div class="markdown-body"><p>Intro para.</p>\n<ul>\n<li>item one</li>\n<li>item two</li>\n</ul>\n'
+        '<p>Closing paragraph.\nAnother line of it.</p></div>'
+    )
+    expected = "Intro para.\n- item one\n- item two\nClosing paragraph.\nAnother line of it."
+    assert optiscaler_parse.parse_detail_markdown(md)['notes'] == expected
+    assert optiscaler_parse.parse_detail_html(rendered)['notes'] == expected
+
+def test_setext_headings_are_not_notes():
+    md = "Title\n=====\n\nBody text.\n\nSection\n-------\n- bullet"
+    assert optiscaler_parse.parse_detail_markdown(md)['notes'] == "Body text.\n- bullet"
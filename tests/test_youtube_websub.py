@@ -0,0 +1,132 @@
+import hmac
+import time
+import threading
+import urllib.parse
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import requests
+import pytest
+import state_store
+import check_youtube
+import youtube_websub
+
+CHANNEL_ID = "UCtestchannel0000000000"
+SECRET = "test-secret"
+
+def atom_feed(video_id, published):
+    return f"""<?xml version="1.0" encoding="UTF-8"?>
+<feed xmlns:yt="http://www.youtube.com/xml/schemas/2015" xmlns="http://www.w3.org/2005/Atom">
+  <entry>
+    <id>yt:video:{video_id}</id>
+    <yt:videoId>{video_id}</yt:videoId>
+    <yt:channelId>{CHANNEL_ID}</yt:channelId>
+    <title>Test upload {video_id}</title>
+    <link rel="alternate" href="https://www.youtube.com/watch?v={video_id}"/>
+    <author><name>Test Channel</name></author>
+    <published>{published}</published>
+    <updated>{published}</updated>
+  </entry>
+</feed>""".encode('utf-8')
+
+def iso(seconds_ago):
+    return datetime.fromtimestamp(time.time() - seconds_ago, timezone.utc).isoformat()
+
+class StandInHub:
+    """구독 요청을 받으면 콜백으로 확인(GET)을 보내고, 그 뒤 준비된 푸시(POST)들을 보내는 로컬 허브"""
+
+    def __init__(self, pushes):
+        self.pushes = pushes  # [(본문, 서명 비밀값)]
+        self.verified = None
+        self.push_status = []
+        self.done = threading.Event()
+        hub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                form = urllib.parse.parse_qs(self.rfile.read(int(self.headers['Content-Length'])).decode())
+                self.send_response(202)
+                self.end_headers()
+                threading.Thread(target=hub.deliver, args=({k: v[0] for k, v in form.items()},)).start()
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/subscribe"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def deliver(self, form):
+        try:
+            res = requests.get(form['hub.callback'], params={
+                "hub.mode": form['hub.mode'], "hub.topic": form['hub.topic'],
+                "hub.challenge": "challenge-123", "hub.lease_seconds": 3600
+            }, timeout=5)
+            self.verified = (res.status_code, res.text)
+            if res.status_code != 200 or res.text != "challenge-123":
+                return
+            for body, key in self.pushes:
+                signature = hmac.new(key.encode(), body, 'sha1').hexdigest()
+                res = requests.post(form['hub.callback'], data=body, timeout=5, headers={
+                    "Content-Type": "application/atom+xml", "X-Hub-Signature": f"sha1={signature}"
+                })
+                self.push_status.append(res.status_code)
+        finally:
+            self.done.set()
+
+@pytest.fixture
+def receiver(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # 저장소의 sent_*.json 을 이관하지 않도록 빈 폴더에서 실행합니다.
+    state_store.open_db(str(tmp_path / "videos.db"))
+    server = ThreadingHTTPServer(("127.0.0.1", 0), youtube_websub.WebSubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setattr(youtube_websub, "SECRET", SECRET)
+    monkeypatch.setattr(youtube_websub, "CALLBACK_URL", f"http://127.0.0.1:{server.server_port}/websub")
+    monkeypatch.setattr(youtube_websub, "TOPICS", {youtube_websub.topic_url(CHANNEL_ID)})
+    sent = []
+    monkeypatch.setattr(check_youtube, "process_videos", lambda videos: sent.extend(v['id'] for v in videos))
+    worker = threading.Thread(target=youtube_websub.process_loop, daemon=True)
+    worker.start()
+    yield sent, worker
+    server.shutdown()
+    server.server_close()
+    state_store.close()
+
+def run_hub(monkeypatch, pushes):
+    hub = StandInHub(pushes)
+    monkeypatch.setattr(youtube_websub, "HUB_URL", hub.url)
+    assert youtube_websub.subscribe(youtube_websub.topic_url(CHANNEL_ID))
+    assert hub.done.wait(10)
+    hub.server.shutdown()
+    return hub
+
+def drain(worker):
+    """대기열에 남은 알림을 다 처리한 뒤 작업 스레드를 끝냅니다."""
+    youtube_websub._notifications.put(None)
+    worker.join(10)
+
+def test_round_trip_with_stand_in_hub(receiver, monkeypatch):
+    sent, worker = receiver
+    state_store.upsert(check_youtube.HISTORY_NS, "seenvideo01")
+    hub = run_hub(monkeypatch, [
+        (atom_feed("newvideo001", iso(60)), SECRET),      # 새 업로드
+        (atom_feed("forgedvid01", iso(60)), "wrong-key"), # 서명이 틀린 가짜 푸시
+        (atom_feed("seenvideo01", iso(60)), SECRET),      # 이미 알린 영상의 재전송
+        (atom_feed("oldvideo001", iso(30 * 86400)), SECRET),  # 예전 영상 수정
+    ])
+    drain(worker)
+
+    assert hub.verified == (200, "challenge-123")
+    assert hub.push_status == [204, 204, 204, 204]
+    assert state_store.get(youtube_websub.LEASE_NS, youtube_websub.topic_url(CHANNEL_ID))['expires'] > time.time()
+    assert sent == ["newvideo001"]
+
+def test_unknown_topic_is_not_verified(receiver):
+    res = requests.get(youtube_websub.CALLBACK_URL, params={
+        "hub.mode": "subscribe", "hub.topic": youtube_websub.topic_url("UCsomeoneelse"), "hub.challenge": "x"
+    }, timeout=5)
+    drain(receiver[1])
+    assert res.status_code == 404
+
+def test_signature_required_without_secret(monkeypatch):
+    monkeypatch.setattr(youtube_websub, "SECRET", None)
+    assert not youtube_websub.valid_signature(b"<feed/>", "sha1=" + "0" * 40)
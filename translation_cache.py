@@ -0,0 +1,70 @@
+import os
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+import state_store
+
+# ================= 설정 =================
+# 번역 결과를 원문 해시로 저장해 두는 캐시입니다. 같은 문장은 두 번 번역하지 않습니다.
+# TRANSLATOR_BACKEND=stub 으로 실행하면 원문을 그대로 돌려주는 로컬 번역기를 씁니다. (테스트용)
+CACHE_NS = "translations"
+MAX_ENTRIES = 3000        # 이 개수를 넘으면 가장 오래 안 쓰인 번역부터 지웁니다.
+TRANSLATE_WORKERS = 4     # 캐시에 없는 문장을 동시에 번역할 개수
+BACKEND = os.environ.get('TRANSLATOR_BACKEND', 'google')
+# =======================================
+
+def _google_backend(text, source, target):
+    from deep_translator import GoogleTranslator
+    return GoogleTranslator(source=source, target=target).translate(text)
+
+def _stub_backend(text, source, target):
+    return text
+
+_backends = {"google": _google_backend, "stub": _stub_backend}
+_backend = _backends.get(BACKEND, _google_backend)
+
+def set_backend(fn):
+    """번역 함수(text, source, target) -> str 를 바꿔 끼웁니다."""
+    global _backend
+    _backend = fn
+
+def _key(text, source, target):
+    return hashlib.sha1(f"{source}\0{target}\0{text}".encode('utf-8')).hexdigest()
+
+def _translate_one(text, source, target):
+    try:
+        result = _backend(text, source, target)
+        return str(result) if result else None
+    except Exception as e:
+        print(f"번역 실패: {e}")
+        return None
+
+def translate_many(texts, source='auto', target='ko'):
+    """
+    여러 문장을 번역합니다. 캐시에 있는 문장은 바로 쓰고, 없는 문장만 동시에 번역해서 저장합니다.
+    번역에 실패한 문장은 원문을 그대로 돌려주고 캐시에 남기지 않습니다.
+    """
+    results = {}
+    misses = []
+    for text in dict.fromkeys(texts):
+        cached = state_store.get(CACHE_NS, _key(text, source, target))
+        if cached is not None:
+            results[text] = cached
+            state_store.upsert(CACHE_NS, _key(text, source, target), cached, commit=False)  # 최근 사용 시각 갱신
+        else:
+            misses.append(text)
+
+    if misses:
+        with ThreadPoolExecutor(max_workers=max(1, min(TRANSLATE_WORKERS, len(misses)))) as executor:
+            for text, translated in zip(misses, executor.map(lambda t: _translate_one(t, source, target), misses)):
+                if translated is None:
+                    results[text] = text
+                    continue
+                results[text] = translated
+                state_store.upsert(CACHE_NS, _key(text, source, target), translated, commit=False)
+        state_store.evict(CACHE_NS, keep_latest=MAX_ENTRIES)
+
+    state_store.commit()
+    return [results[text] for text in texts]
+
+def translate(text, source='auto', target='ko'):
+    return translate_many([text], source, target)[0]
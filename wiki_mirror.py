@@ -0,0 +1,66 @@
+import os
+import subprocess
+import urllib.parse
+
+# ================= 설정 =================
+# OptiScaler 위키 저장소를 로컬에 복제해 두고, 실행할 때마다 바뀐 부분만 받아옵니다.
+# 파일별 git blob 해시를 비교해서 내용이 바뀐 상세 페이지만 다시 파싱할 수 있게 합니다.
+WIKI_REPO_URL = "https://github.com/optiscaler/OptiScaler.wiki.git"
+MIRROR_DIR = os.environ.get('WIKI_MIRROR_DIR', '.wiki_mirror')
+GIT_TIMEOUT = 120
+# =======================================
+
+def _git(*args):
+    return subprocess.run(
+        ["git", "-C", MIRROR_DIR, *args],
+        capture_output=True, text=True, timeout=GIT_TIMEOUT, check=True
+    ).stdout
+
+def sync():
+    """미러가 없으면 얕게 복제하고, 있으면 증분 fetch 후 최신 상태로 맞춥니다. 성공하면 True"""
+    try:
+        if not os.path.isdir(os.path.join(MIRROR_DIR, ".git")):
+            subprocess.run(
+                ["git", "clone", "--depth", "1", WIKI_REPO_URL, MIRROR_DIR],
+                capture_output=True, text=True, timeout=GIT_TIMEOUT, check=True
+            )
+        else:
+            _git("fetch", "--depth", "1", "origin")
+            _git("reset", "--hard", "FETCH_HEAD")
+        return True
+    except Exception as e:
+        print(f"위키 미러 동기화 실패: {e}")
+        return False
+
+def blob_hashes():
+    """{소문자 페이지 이름: (파일 경로, blob 해시)} - 마크다운 파일만"""
+    pages = {}
+    # 한글·특수문자 경로가 따옴표와 \ooo 로 바뀌지 않도록 quotepath 를 끄고 NUL 로 구분해서 읽습니다.
+    for entry in _git("-c", "core.quotepath=off", "ls-tree", "-r", "-z", "HEAD").split("\0"):
+        if not entry:
+            continue
+        meta, path = entry.split("\t", 1)
+        if not path.endswith(".md"):
+            continue
+        blob = meta.split()[2]
+        name = os.path.basename(path)[:-len(".md")]
+        pages[name.lower()] = (path, blob)
+    return pages
+
+def page_name(link):
+    """상세 페이지 링크(전체 URL 또는 페이지 이름)를 위키 파일 이름으로 바꿉니다."""
+    if not link:
+        return None
+    page = link.split('/wiki/')[-1] if "github.com/" in link else link
+    page = urllib.parse.unquote(page.split('#')[0].strip())
+    return page.replace(' ', '-')
+
+def read_page(path):
+    with open(os.path.join(MIRROR_DIR, path), "r", encoding='utf-8') as f:
+        return f.read()
+
+def iter_lines(path):
+    """페이지를 한 줄씩 읽습니다."""
+    with open(os.path.join(MIRROR_DIR, path), "r", encoding='utf-8') as f:
+        for line in f:
+            yield line.rstrip('\n')
@@ -0,0 +1,205 @@
+import os
+import hmac
+import time
+import queue
+import threading
+import urllib.parse
+import xml.etree.ElementTree as ET
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import http_client
+import state_store
+import check_youtube
+
+# ================= 설정 =================
+# 유튜브 업로드 알림을 WebSub(PubSubHubbub) 푸시로 받는 수신 서버입니다.
+# 크론으로 피드를 주기적으로 확인하는 대신, 허브가 새 영상을 바로 이 서버로 보내 줍니다.
+# 외부에서 접속할 수 있는 주소(WEBSUB_CALLBACK)가 필요하므로 GitHub Actions 가 아닌 상시 서버에서 실행하세요.
+#   WEBSUB_CALLBACK=https://example.com/websub WEBSUB_SECRET=<임의의 긴 문자열> python youtube_websub.py
+# 테스트할 때는 WEBSUB_HUB 를 로컬 대역 허브 주소로 바꾸면 됩니다.
+# 처리 기록은 크론 봇(check_youtube.yml)과 같은 state/videos.db 를 씁니다. 수신 서버를 쓰는 동안에는
+# 워크플로 예약 실행을 끄세요. 놓친 푸시는 이 서버가 FALLBACK_INTERVAL 마다 피드를 직접 확인해서 채웁니다.
+HUB_URL = os.environ.get('WEBSUB_HUB', 'https://pubsubhubbub.appspot.com/subscribe')
+CALLBACK_URL = os.environ.get('WEBSUB_CALLBACK')
+LISTEN_HOST = os.environ.get('WEBSUB_HOST', '0.0.0.0')
+LISTEN_PORT = int(os.environ.get('WEBSUB_PORT', 8080))
+SECRET = os.environ.get('WEBSUB_SECRET')  # 필수: 허브가 보낸 본문의 HMAC 서명을 확인합니다.
+STATE_DB = os.environ.get('STATE_DB', 'state/videos.db')
+FALLBACK_INTERVAL = int(os.environ.get('WEBSUB_FALLBACK_INTERVAL', 3600))  # 피드를 직접 확인하는 주기 (초, 0 = 끔)
+PUSH_MAX_AGE = 24 * 3600                  # 게시된 지 이보다 오래된 영상의 푸시(제목·설명 수정 등)는 알리지 않습니다.
+LEASE_SECONDS = 5 * 24 * 3600             # 요청할 구독 기간 (허브가 더 짧게 정할 수 있음)
+RENEW_BEFORE = 12 * 3600                  # 만료 이만큼 전에 구독을 갱신합니다.
+RENEW_CHECK_INTERVAL = 600                # 구독 만료를 확인하는 주기 (초)
+LEASE_NS = "websub_leases"                # 토픽 → {"expires": 만료 시각}
+# =======================================
+
+def topic_url(channel_id):
+    return f"https://www.youtube.com/xml/feeds/videos.xml?channel_id={channel_id}"
+
+TOPICS = {topic_url(channel_id) for channel_id in check_youtube.CHANNELS}
+_notifications = queue.Queue()
+_POLL = object()  # 처리 대기열에 넣으면 푸시 대신 피드 확인(check_youtube.run)을 실행합니다.
+
+def subscribe(topic, mode="subscribe"):
+    """허브에 구독(또는 해지)을 요청합니다. 실제 확정은 허브가 콜백으로 확인 요청을 보낸 뒤입니다."""
+    data = {
+        "hub.callback": CALLBACK_URL,
+        "hub.topic": topic,
+        "hub.mode": mode,
+        "hub.verify": "async",
+        "hub.lease_seconds": LEASE_SECONDS
+    }
+    if SECRET:
+        data["hub.secret"] = SECRET
+    try:
+        res = http_client.post(HUB_URL, data=data, timeout=10)
+        if res.status_code not in (202, 204):
+            print(f"⚠️ 구독 요청 실패 ({topic}): HTTP {res.status_code} {res.text[:100]}")
+            return False
+        print(f"📨 구독 요청 보냄: {mode} {topic}")
+        return True
+    except Exception as e:
+        print(f"⚠️ 구독 요청 에러 ({topic}): {e}")
+        return False
+
+def renew_loop(stop_event):
+    """구독이 없거나 곧 만료되는 토픽을 주기적으로 다시 구독합니다."""
+    while not stop_event.is_set():
+        now = time.time()
+        for topic in sorted(TOPICS):
+            lease = state_store.get(LEASE_NS, topic) or {}
+            if lease.get('expires', 0) - now < RENEW_BEFORE:
+                subscribe(topic)
+        stop_event.wait(RENEW_CHECK_INTERVAL)
+
+def poll_loop(stop_event):
+    """시작할 때와 FALLBACK_INTERVAL 마다 피드 확인을 처리 대기열에 넣습니다. (놓친 푸시 보충)"""
+    while not stop_event.is_set():
+        _notifications.put(_POLL)
+        stop_event.wait(FALLBACK_INTERVAL)
+
+def valid_signature(body, header):
+    """X-Hub-Signature: sha1=<hex> (sha256 등도 허용) 를 확인합니다. 비밀값이 없으면 어떤 알림도 믿지 않습니다."""
+    if not SECRET:
+        return False
+    if not header or '=' not in header:
+        return False
+    method, signature = header.split('=', 1)
+    try:
+        expected = hmac.new(SECRET.encode('utf-8'), body, method.lower()).hexdigest()
+    except ValueError:
+        return False
+    return hmac.compare_digest(expected, signature.strip().lower())
+
+def is_recent(video, now=None):
+    """게시된 지 PUSH_MAX_AGE 가 지나지 않았는지. 게시 시각을 읽을 수 없으면 새 영상으로 봅니다."""
+    try:
+        published = datetime.fromisoformat(video.get('published', '').replace('Z', '+00:00'))
+    except ValueError:
+        return True
+    return (now or time.time()) - published.timestamp() < PUSH_MAX_AGE
+
+def process_loop():
+    """
+    받은 알림을 한 건씩 처리합니다. (수신 응답은 먼저 보내고 여기서 알림을 보냅니다)
+    피드 확인도 같은 대기열에서 차례로 실행하므로 같은 영상을 푸시와 피드 양쪽에서 동시에 알리지 않습니다.
+    """
+    while True:
+        body = _notifications.get()
+        if body is None:
+            return
+        try:
+            if body is _POLL:
+                check_youtube.run()
+                continue
+            videos = check_youtube.parse_feed(body)
+            unseen = [v for v in videos if not state_store.is_seen(check_youtube.HISTORY_NS, v['id'])]
+            # 오래된 영상을 수정해도 푸시가 오므로, 기록이 정리된 예전 영상이 다시 알려지지 않게 걸러냅니다.
+            fresh = [v for v in unseen if is_recent(v)]
+            if fresh:
+                # 푸시는 최신순이 보장되지 않으므로 게시 시각 순으로 정렬해서 보냅니다.
+                fresh.sort(key=lambda v: v.get('published', ''))
+                check_youtube.process_videos(fresh)
+            elif videos:
+                print(f"새 영상이 아닌 알림 (수정/재전송): {', '.join(v['id'] for v in videos)}")
+        except ET.ParseError as e:
+            print(f"⚠️ 푸시 본문 파싱 실패: {e}")
+        except Exception as e:
+            print(f"❌ 푸시 처리 에러: {e}")
+
+class WebSubHandler(BaseHTTPRequestHandler):
+    def _reply(self, status, body=b""):
+        self.send_response(status)
+        self.send_header("Content-Type", "text/plain; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        """구독 확인 요청: 우리가 요청한 토픽이면 hub.challenge 를 그대로 돌려줍니다."""
+        params = urllib.parse.parse_qs(urllib.parse.urlsplit(self.path).query)
+        mode = params.get('hub.mode', [''])[0]
+        topic = params.get('hub.topic', [''])[0]
+        challenge = params.get('hub.challenge', [''])[0]
+
+        if mode == "denied":
+            print(f"⚠️ 허브가 구독을 거부했습니다: {topic} ({params.get('hub.reason', [''])[0]})")
+            return self._reply(200)
+        if topic not in TOPICS or mode not in ("subscribe", "unsubscribe") or not challenge:
+            return self._reply(404)
+
+        if mode == "subscribe":
+            lease = int(params.get('hub.lease_seconds', [LEASE_SECONDS])[0])
+            state_store.upsert(LEASE_NS, topic, {"expires": time.time() + lease})
+            print(f"✅ 구독 확정: {topic} ({lease // 3600}시간)")
+        else:
+            state_store.delete(LEASE_NS, topic)
+            print(f"구독 해지 확정: {topic}")
+        self._reply(200, challenge.encode('utf-8'))
+
+    def do_POST(self):
+        """새 영상 알림: 서명이 맞으면 처리 대기열에 넣고 바로 응답합니다."""
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length)
+        if valid_signature(body, self.headers.get('X-Hub-Signature')):
+            _notifications.put(body)
+        else:
+            # 규격상 서명이 틀려도 2xx 로 응답하고 내용만 버립니다.
+            print("⚠️ 서명이 맞지 않는 푸시를 무시합니다.")
+        self._reply(204)
+
+    def log_message(self, format, *args):
+        print(f"[websub] {self.address_string()} {format % args}")
+
+def serve():
+    if not CALLBACK_URL:
+        print("⚠️ 오류: WEBSUB_CALLBACK (외부에서 접속 가능한 콜백 주소) 설정이 필요합니다.")
+        exit()
+    if not SECRET:
+        # 콜백 주소는 공개되어 있으므로 서명 없이는 누구나 가짜 피드를 보내 디스코드에 올릴 수 있습니다.
+        print("⚠️ 오류: WEBSUB_SECRET (푸시 서명 확인용 비밀값) 설정이 필요합니다.")
+        exit()
+
+    state_store.open_db(STATE_DB)
+    stop_event = threading.Event()
+    worker = threading.Thread(target=process_loop, daemon=True)
+    worker.start()
+    server = ThreadingHTTPServer((LISTEN_HOST, LISTEN_PORT), WebSubHandler)
+    renewer = threading.Thread(target=renew_loop, args=(stop_event,), daemon=True)
+    renewer.start()
+    if FALLBACK_INTERVAL > 0:
+        threading.Thread(target=poll_loop, args=(stop_event,), daemon=True).start()
+    print(f"--- 유튜브 WebSub 수신 대기: {LISTEN_HOST}:{LISTEN_PORT} (채널 {len(TOPICS)}개) ---")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("종료합니다.")
+    finally:
+        stop_event.set()
+        server.server_close()
+        _notifications.put(None)
+        worker.join(timeout=30)
+        state_store.commit()
+
+if __name__ == "__main__":
+    serve()